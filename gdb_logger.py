@@ -1,28 +1,335 @@
+import atexit
 import gdb
-from typing import Callable
-logger = None
+import os
+import queue
+import sys
+import threading
+from collections import deque
+from typing import Callable, Iterable, cast
+
+# Log file name set by logging_on().  The file is opened there, so a bad path
+# is reported to the caller, and written with os.writev() on a raw fd so no
+# Python I/O layers sit between the buffer below and the kernel.
+_log_filename : str | None = None
+_fd : int | None = None
+_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+# Encoded log output waiting to be written to the log file, kept as separate
+# prefix/message/newline pieces that are gathered by os.writev() rather than
+# copied together.  Written once it holds _FILE_BUF_LIMIT bytes.
+_FILE_BUF_LIMIT = 1<<16
+_file_parts : list[bytes] = []
+_file_size = 0
+
+# Most buffers os.writev() accepts in one call (IOV_MAX on Linux).
+_IOV_MAX = 1024
+
 def logging_on(log_filename : str) -> None:
   if log_filename == '':
     return
-  global logger
-  logger = open(log_filename, "w")
+  global _log_filename, _fd
+  _close_file()
+  _log_filename = None
+  try:
+    _fd = os.open(log_filename, _OPEN_FLAGS, 0o644)
+    _log_filename = log_filename
+  finally:
+    _update_active()
+
+def _write_all(fd : int, data : bytes) -> None:
+  view = memoryview(data)
+  while view:
+    view = view[os.write(fd, view):]
+
+def _write_file(fd : int, parts : list[bytes]) -> None:
+  if not hasattr(os, "writev"):
+    # e.g. Windows
+    _write_all(fd, b"".join(parts))
+    return
+  for i in range(0, len(parts), _IOV_MAX):
+    batch = parts[i:i + _IOV_MAX]
+    written = os.writev(fd, batch)
+    if written < sum(map(len, batch)):
+      _write_all(fd, b"".join(batch)[written:])
+
+# File writes are handed to a background thread so gdb doesn't block on disk.
+# The queue is bounded so a stalled disk applies backpressure instead of
+# growing memory without limit.  None tells the thread to stop.
+_write_queue : queue.Queue[list[bytes] | None] = queue.Queue(maxsize=64)
+_writer : threading.Thread | None = None
+
+# Errors from the writer thread, reported on gdb's thread by log_flush() since
+# gdb.write() can't be called from another thread.  Only the first error since
+# the last report is kept, so a full disk reports once rather than per batch.
+_write_errors : list[str] = []
+
+def _writer_loop() -> None:
+  # A failed write drops that batch but keeps the queue draining, so gdb never
+  # blocks on a queue nothing is emptying.
+  while (parts := _write_queue.get()) is not None:
+    try:
+      _write_file(cast(int, _fd), parts)
+    except Exception as e:
+      if not _write_errors:
+        _write_errors.append(f"[LOGGER] couldn't write to {_log_filename}: {e}\n")
+
+def _start_writer() -> threading.Thread:
+  # Also replaces a writer thread that has died, so queued batches are drained.
+  global _writer
+  if _writer is None or not _writer.is_alive():
+    _writer = threading.Thread(target=_writer_loop, name="gdb_logger", daemon=True)
+    _writer.start()
+  return _writer
+
+def _report_write_errors() -> None:
+  while _write_errors:
+    gdb.write(_write_errors.pop(0), gdb.STDERR)
+
+def _flush_file() -> None:
+  global _file_size
+  if not _file_parts:
+    return
+  _start_writer()
+  _write_queue.put(_file_parts.copy())
+  _file_parts.clear()
+  _file_size = 0
+
+def _close_file() -> None:
+  global _fd, _writer
+  _flush_file()
+  if _writer is not None:
+    writer = _start_writer()
+    _write_queue.put(None)
+    writer.join()
+    _writer = None
+  if _fd is not None:
+    os.close(_fd)
+    _fd = None
+
+# Log lines waiting to be written to the gdb console.  They are written as one
+# batch before each prompt, or sooner if this many lines pile up during a
+# single command.
+_MAX_PENDING = 1024
+_pending : deque[str] = deque()
+
+def _drain(*, _write : Callable[..., None] = gdb.write,
+           _stdout : int = gdb.STDOUT) -> None:
+  if not _pending:
+    return
+  payload = "".join(_pending)
+  _pending.clear()
+
+  if _to_gdb:
+    _write(payload, _stdout)
+
+def log_flush() -> None:
+  """Write out any pending log messages and flush the gdb console and the log
+  file."""
+  _drain()
+  _report_write_errors()
+  if _to_gdb:
+    gdb.flush()
+  _flush_file()
+
+def _at_exit() -> None:
+  _drain()
+  _close_file()
+
+atexit.register(_at_exit)
+
+# Cached state of gdb's `set logging enabled` so log() doesn't have to query
+# gdb for it on every message.  gdb has no event for parameter changes, so it's
+# refreshed before each prompt.  gdb older than 12 has no such parameter; that
+# is found out once here rather than by catching an error on every refresh, and
+# logging is taken to be enabled so the console can still be written to.
+try:
+  _gdb_logging_enabled = bool(gdb.parameter("logging enabled"))
+  _has_gdb_logging_param = True
+except (gdb.error, RuntimeError):
+  _gdb_logging_enabled = True
+  _has_gdb_logging_param = False
+
+# True if the gdb console is only written to while gdb logging is enabled.  Off
+# by default, so the console gets every message as it always has.
+_follow_gdb_logging = False
+
+def set_gdb_logging(on : bool) -> None:
+  """Set whether log() writes to the gdb console (and so to gdb's log file)
+  while follow_gdb_logging() is on.
+
+  Parameters
+  ----------
+  on : bool
+      True to write log messages to the gdb console.
+  """
+  global _gdb_logging_enabled
+  _gdb_logging_enabled = on
+  _update_active()
+
+_SINKS = ("gdb", "file", "both")
+
+# Where log() writes: "gdb" (the console), "file" (the logging_on() file) or
+# "both".  None picks "file" if a log file is open and "gdb" if not.  Writing
+# only to the file is the cheapest.
+_sink : str | None = os.environ.get("GDB_PP_LOG_SINK") or None
+if _sink not in (None, *_SINKS):
+  _sink = None
 
-def log(msg : str | Callable[[], str]) -> None:
-  """Log a message to gdb console.
+def set_log_sink(sink : str | None) -> None:
+  """Choose where log() writes.
 
   Parameters
   ----------
-  msg : str
-      The message to log.
+  sink : str | None
+      "gdb" for the gdb console only, "file" for the logging_on() file only,
+      "both" for both, or None to use the file if one is open and the gdb
+      console otherwise.  Defaults to the GDB_PP_LOG_SINK environment variable.
+
+  Raises
+  ------
+  ValueError
+      sink isn't one of the above.
+  """
+  global _sink
+  if sink not in (None, *_SINKS):
+    raise ValueError(f"log sink must be one of {_SINKS} or None, not {sink!r}")
+  _sink = sink
+  _update_active()
+
+# Line formats for messages that already start with a "[tag]" and for those
+# that don't.  A single % format builds the line in one allocation.  The file
+# gets the same prefixes pre-encoded so only the message itself is encoded.
+# Bound into the line writers as defaults so they are local loads.
+_FORMAT_TAGGED = sys.intern("[LOGGER]%s\n")
+_FORMAT = sys.intern("[LOGGER] %s\n")
+_PREFIX_TAGGED_BYTES = b"[LOGGER]"
+_PREFIX_BYTES = b"[LOGGER] "
+
+def _gdb_write_line(msg : str, tagged : bool, *,
+                    _format_tagged : str = _FORMAT_TAGGED, _format : str = _FORMAT,
+                    _append : Callable[[str], None] = _pending.append) -> None:
+  _append((_format_tagged if tagged else _format) % msg)
+  if len(_pending) >= _MAX_PENDING:
+    _drain()
+
+def _file_write_line(msg : str, tagged : bool, *,
+                     _prefix_tagged_bytes : bytes = _PREFIX_TAGGED_BYTES,
+                     _prefix_bytes : bytes = _PREFIX_BYTES,
+                     _append : Callable[[bytes], None] = _file_parts.append) -> None:
+  global _file_size
+  data = msg.encode("utf-8", "replace")
+  _append(_prefix_tagged_bytes if tagged else _prefix_bytes)
+  _append(data)
+  _append(b"\n")
+  _file_size += len(data) + 10
+  if _file_size >= _FILE_BUF_LIMIT:
+    _flush_file()
+
+def _discard_line(msg : str, tagged : bool) -> None:
+  pass
+
+# Which sinks are active, and True in _active if any are.  Kept up to date by
+# the functions that change the sinks so log() only has to test one flag.  An
+# inactive sink's line writer is _discard_line so log() calls both writers
+# without testing which sinks are on.
+_to_gdb = _to_file = _active = False
+_gdb_line = _file_line = _discard_line
+
+def _update_active() -> None:
+  global _to_gdb, _to_file, _active, _gdb_line, _file_line
+  sink = _sink or ("file" if _log_filename else "gdb")
+  _to_gdb = sink != "file" and (_gdb_logging_enabled or not _follow_gdb_logging)
+  _to_file = bool(_log_filename) and sink != "gdb"
+  _active = _to_gdb or _to_file
+  _gdb_line = _gdb_write_line if _to_gdb else _discard_line
+  _file_line = _file_write_line if _to_file else _discard_line
+
+_update_active()
+
+def follow_gdb_logging(on : bool = True) -> None:
+  """Set whether log() only writes to the gdb console while gdb's logging is
+  enabled (`set logging enabled on`).
+
+  Parameters
+  ----------
+  on : bool
+      True to follow gdb's logging setting, False to always write to the
+      console.
   """
-  if callable(msg):
+  global _follow_gdb_logging
+  _follow_gdb_logging = on
+  _update_active()
+
+def _before_prompt() -> None:
+  log_flush()
+  if _has_gdb_logging_param:
+    on = bool(gdb.parameter("logging enabled"))
+    if on != _gdb_logging_enabled:
+      set_gdb_logging(on)
+
+def _on_cont(_ : gdb.ContinueEvent) -> None:
+  log_flush()
+
+gdb.events.before_prompt.connect(_before_prompt)
+gdb.events.cont.connect(_on_cont)
+
+# Only the sink state is looked up globally.  It can't be closed over because
+# callers keep this function from `from gdb_logger import log`, so log() can't
+# be rebuilt when the sinks change.
+def log(msg : str | Callable[[], str], *args : object,
+        _callable : Callable[[object], bool] = callable) -> None:
+  """Log a message to the sinks chosen by set_log_sink().  The file is only
+  written to if one was opened with logging_on(), and the gdb console only
+  while gdb logging is enabled if follow_gdb_logging() is on.
+
+  Messages are buffered and written before the next prompt, or by log_flush().
+
+  Parameters
+  ----------
+  msg : str | Callable[[], str]
+      The message to log, or a function returning it.  If `args` are given,
+      a % format string for them.
+  args : object
+      Values formatted into `msg`.  Only converted to strings if the message
+      is written, so prefer them to an f-string for values such as gdb.Values
+      and gdb.Types that are costly to stringify.
+  """
+  if not _active:
+    return
+
+  if _callable(msg):
     msg = msg()
+  if args:
+    msg = msg % args
+
+  tagged = msg.startswith("[")
+  _file_line(msg, tagged)
+  _gdb_line(msg, tagged)
+
+def log_many(msgs : Iterable[str]) -> None:
+  """Log several messages as one batch.  Same as calling log() on each, but the
+  lines are assembled into one string and handed to each sink in one go.
+
+  Parameters
+  ----------
+  msgs : Iterable[str]
+      The messages to log.
+  """
+  global _file_size
+  if not _active:
+    return
 
-  log_msg = f"[LOGGER]{"" if (msg[0] == "[") else " "}{msg}\n"
+  payload = "".join([(_FORMAT_TAGGED if msg.startswith("[") else _FORMAT) % msg
+                     for msg in msgs])
 
-  gdb.write(log_msg, gdb.STDOUT)
-  gdb.flush()
+  if _to_file:
+    data = payload.encode("utf-8", "replace")
+    _file_parts.append(data)
+    _file_size += len(data)
+    if _file_size >= _FILE_BUF_LIMIT:
+      _flush_file()
 
-  if logger:  
-    logger.write(log_msg)
-    logger.flush()
+  if _to_gdb:
+    _pending.append(payload)
+    if len(_pending) >= _MAX_PENDING:
+      _drain()
@@ -3,18 +3,58 @@ Framework to make a cohesive, easy to use pretty printer for gdb.  This uses
 synthetic nodes to group data together into static, raw, and other views making
 it easier to read and find information.
 """
+import functools
 import gdb
 import re
 import traceback
 
 from typing import TypedDict, Required, NotRequired, Callable, Optional, \
    TypeVar, TypeAlias, Protocol, Union, Any, cast, overload
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from gdb_logger import log
-from gdb_synthetic_nodes import make_enums_tag, extract_enums_tag, recover_value
+from gdb_synthetic_nodes import make_enums_tag, enums_tagger, enums_type_tagger, try_split_enums_tag
+
+class _FormattedTraceback:
+  """str() is the traceback of the exception being handled.  Passed to log()
+  as an argument so the traceback is only formatted if the message is
+  written."""
+  __slots__ = ()
+
+  def __str__(self) -> str:
+    return traceback.format_exc()
+
+_TRACEBACK = _FormattedTraceback()
 
 MAX_SUMMARY_LEN = 100
 
+_CacheT = TypeVar("_CacheT", bound=dict[Any, Any])
+
+# clear() of each cache of per-type information.  They're all emptied together
+# by _clear_type_caches() when code is loaded or unloaded.
+_type_cache_clears : list[Callable[[], None]] = []
+
+def _type_cache(cache : _CacheT) -> _CacheT:
+  """Registers `cache` to be cleared with the other per-type caches."""
+  _type_cache_clears.append(cache.clear)
+  return cache
+
+# Whether printer summaries are generated.  See set_summaries_enabled().
+_summaries_enabled = True
+
+def set_summaries_enabled(on : bool) -> None:
+  """Turn printer summaries on or off.  A summary function may read many
+  members, or call functions in the inferior, for a string a front end that
+  only lists children throws away.  While off, values registered with
+  add_printer()/add_re_printer() and their views show an empty summary.
+
+  Parameters
+  ----------
+  on : bool
+      True to generate summaries (the default).
+  """
+  global _summaries_enabled
+  _summaries_enabled = on
+
 ValueLike: TypeAlias = gdb.Value | str | None
 PrinterChild:     TypeAlias = tuple[str, ValueLike]
 PrinterChildren:  TypeAlias = Iterator[PrinterChild]
@@ -42,8 +82,58 @@ class Printer(TypedDict):
   default_view: NotRequired[str]
   views: NotRequired[tuple[View, ...]]
 
-_pretty_printers : dict[str, Printer] = {}
-_pretty_printers_re : list[tuple[re.Pattern[str], Printer]] = []
+# The printers added, each as the _PrinterInfo worked out for it when it was
+# added, so lookups hand back the info itself.
+# type name -> printer info
+_pretty_printers : dict[str, "_PrinterInfo"] = {}
+# (compiled regex, printer info, literal prefix every match must start with)
+_pretty_printers_re : list[tuple[re.Pattern[str], "_PrinterInfo", str]] = []
+
+# The regex printers, in the order they were added, as runs that are each
+# matched with one regex: (regex, (group, pattern, info) for each printer in
+# the run, literal prefix a match must start with).  Consecutive patterns are
+# fused into one alternation where group p<i> matching means the run's i-th
+# printer matched.  A pattern that can't be fused (see _can_combine()) is a run
+# of its own whose candidate group is 0, the whole match.  Rebuilt on the next
+# lookup after a regex printer is added.
+_ReRun : TypeAlias = tuple[re.Pattern[str], tuple[tuple[int, re.Pattern[str], "_PrinterInfo"], ...], str]
+_re_runs : list[_ReRun] = []
+_re_runs_dirty = False
+
+# A numbered backreference or conditional (\1, (?(1)...)).  The numbers would
+# point at the wrong groups once the pattern is inside an alternation.
+_NUMBERED_GROUP_REF_RE = re.compile(r"(?<!\\)(?:\\\\)*(?:\\[1-9]|\(\?\(\d)")
+
+# Most type strings _match_printer() remembers the printer (or None) for.
+# Past that the least recently used is dropped, so long sessions over many
+# types don't grow it without bound.
+_RESOLVED_CACHE_MAX = 4096
+
+_RE_SPECIAL = frozenset(".^$*+?{}[]\\|()")
+
+def _literal_prefix(type_re : str) -> str:
+  """Returns the literal text that any match of `type_re` has to start with.
+     Conservative: returns "" if it can't tell.
+  """
+  if "|" in type_re:
+    return "" # an alternative could start with anything
+  prefix : list[str] = []
+  i = 0
+  while i < len(type_re):
+    c = type_re[i]
+    step = 1
+    if c == "\\":
+      if i + 1 >= len(type_re) or type_re[i + 1].isalnum():
+        break # character class like \d or \w
+      c = type_re[i + 1]
+      step = 2
+    elif c in _RE_SPECIAL:
+      break
+    if type_re[i + step:i + step + 1] in ("*", "?", "{"):
+      break # c is optional
+    prefix.append(c)
+    i += step
+  return "".join(prefix)
 
 
 def add_printer(type_name : str, printer : Printer):
@@ -73,6 +163,8 @@ def add_printer(type_name : str, printer : Printer):
             - An even number of elements, where:
               - 1st element is the name of the element, and
               - 2nd element is a lambda(v) : {gdb.Value | any}
+              - operator.itemgetter("member") gets a member without a Python
+                call.
           "node" - class object (optional)
             - For complex views, it may be necessary to write a full blown class
               pretty printer.
@@ -81,8 +173,9 @@ def add_printer(type_name : str, printer : Printer):
           - Name of view to show at top level.
           - If not specified, the raw view will be at top level.
   """
-  log(f"Adding exact printer for type: {type_name}")
-  _pretty_printers[type_name] = printer
+  log("Adding exact printer for type: %s", type_name)
+  _pretty_printers[type_name] = _PrinterInfo(printer)
+  _match_printer.cache_clear()
 
 def add_re_printer(type_re : str, printer : Printer):
   """Add a new printer by specifying a structure.
@@ -111,6 +204,8 @@ def add_re_printer(type_re : str, printer : Printer):
             - An even number of elements, where:
               - 1st element is the name of the element, and
               - 2nd element is a lambda(v) : {gdb.Value | any}
+              - operator.itemgetter("member") gets a member without a Python
+                call.
           "node" - class object (optional)
             - For complex views, it may be necessary to write a full blown class
               pretty printer.
@@ -119,19 +214,75 @@ def add_re_printer(type_re : str, printer : Printer):
           - Name of view to show at top level.
           - If not specified, the raw view will be at top level.
   """
-  log(f"Adding regex printer for type: {type_re}")
-  _pretty_printers_re.append( (re.compile(type_re), printer) )
-
-def _match_printer(type_str : str) -> Printer | None:
-  if type_str in _pretty_printers:
-    log(f"Exact match for type: {type_str}")
-    return _pretty_printers[type_str]
-  for (regex, printer) in _pretty_printers_re:
-    if regex.match(type_str):
-      log(f"Regex match for type: {type_str} with {regex.pattern}")
-      return printer
+  log("Adding regex printer for type: %s", type_re)
+  global _re_runs_dirty
+  _pretty_printers_re.append( (re.compile(type_re), _PrinterInfo(printer), _literal_prefix(type_re)) )
+  _re_runs_dirty = True
+  _match_printer.cache_clear()
+
+def _can_combine(regex : re.Pattern[str]) -> bool:
+  return _NUMBERED_GROUP_REF_RE.search(regex.pattern) is None
+
+def _single_run(regex : re.Pattern[str], info : "_PrinterInfo", prefix : str) -> _ReRun:
+  return (regex, ((0, regex, info),), prefix)
+
+def _combined_run(entries : list[tuple[re.Pattern[str], "_PrinterInfo", str]]) -> list[_ReRun]:
+  if len(entries) == 1:
+    return [_single_run(*entries[0])]
+  try:
+    combined = re.compile("|".join(
+      f"(?P<p{i}>{regex.pattern})" for i, (regex, _, _) in enumerate(entries)))
+  except re.error as e:
+    log("Can't combine regex printers, matching them one at a time: %s", e)
+    return [_single_run(*entry) for entry in entries]
+  return [(combined, tuple((combined.groupindex[f"p{i}"], regex, info)
+                           for i, (regex, info, _) in enumerate(entries)), "")]
+
+def _build_re_runs() -> None:
+  global _re_runs_dirty
+  _re_runs_dirty = False
+  _re_runs.clear()
+  pending : list[tuple[re.Pattern[str], "_PrinterInfo", str]] = []
+  for entry in _pretty_printers_re:
+    if _can_combine(entry[0]):
+      pending.append(entry)
+      continue
+    if pending:
+      _re_runs.extend(_combined_run(pending))
+      pending = []
+    _re_runs.append(_single_run(*entry))
+  if pending:
+    _re_runs.extend(_combined_run(pending))
+
+def _match_printer_uncached(type_str : str) -> "_PrinterInfo | None":
+  info = _pretty_printers.get(type_str)
+  if info is not None:
+    log("Exact match for type: %s", type_str)
+    return info
+  if not _pretty_printers_re:
+    return None
+
+  if _re_runs_dirty:
+    _build_re_runs()
+  for run_re, candidates, prefix in _re_runs:
+    if not type_str.startswith(prefix):
+      continue
+    m = run_re.match(type_str)
+    if m is None:
+      continue
+    # The group that took part in the match says which pattern it was.  Only
+    # one p<i> group can, as the alternation stops at the first that matches.
+    for group, regex, info in candidates:
+      if m.start(group) != -1:
+        log("Regex match for type: %s with %s", type_str, regex.pattern)
+        return info
   return None
 
+# type string -> info of its printer, or None if it has none.  Cleared when a printer is
+# added, and when code is loaded or unloaded.
+_match_printer = functools.lru_cache(maxsize=_RESOLVED_CACHE_MAX)(_match_printer_uncached)
+_type_cache_clears.append(_match_printer.cache_clear)
+
 # Synthetic node tags
 # Each tag is a tuple of integers; the first integer indicates the kind of node.
 _MSG_ENUM_I = 0
@@ -141,9 +292,13 @@ _STATIC_ENUM_I = 1
 _STATIC_ENUM = (_STATIC_ENUM_I,)
 _RAW_ENUM_I = 2
 _RAW_ENUM = (_RAW_ENUM_I,)
+# A chunk is tagged by its first element when the rest follow it in memory,
+# and by an iterator to its first element otherwise.
 _CHUNK_ENUM_I = 3
 def _CHUNK_ENUM(offset : int, chunk_size : int) -> tuple[int, ...]:
   return (_CHUNK_ENUM_I, offset, chunk_size)
+def _ITER_CHUNK_ENUM(offset : int, chunk_size : int) -> tuple[int, ...]:
+  return (_CHUNK_ENUM_I, offset, chunk_size, 1)
 _VIEW_ENUM_I = 4
 def _VIEW_ENUM(view_index : int) -> tuple[int, ...]:
   return (_VIEW_ENUM_I + view_index,)
@@ -158,67 +313,264 @@ def _unwrap_ptr_like(it):
   - libc++:    std::__wrap_iter<T*>                   -> __i
   - MSVC:      std::_Vector_iterator / _List_iterator -> _Ptr
   """
+  t = it.type
+  key = _type_key(t)
+  entry = _ptr_member_cache.get(key) if key is not None else None
+  if entry is not None and entry[0] == t:
+    member = entry[1]
+  else:
+    member = _find_ptr_member(it)
+    if key is not None:
+      _ptr_member_cache[key] = (t, member)
+  if member is None:
+    return None
+  return it if member == "" else it[member]
+
+# _type_key(iterator type) -> (the type, the member of it holding a T*, "" if
+# the type is itself a T*, or None if it isn't pointer-like).  The type is kept
+# so a different type of the same name isn't given its entry.
+_ptr_member_cache : dict[str, tuple[gdb.Type, str | None]] = _type_cache({})
+
+_PTR_MEMBER_NAMES = ("_M_current", "__i", "_Ptr")
+
+def _find_ptr_member(it : gdb.Value) -> str | None:
   t = it.type.strip_typedefs()
   if t.code == gdb.TYPE_CODE_PTR:
-    return it
-  for name in ("_M_current", "__i", "_Ptr"):
-    try:
-      p = it[name]
-      if p.type.strip_typedefs().code == gdb.TYPE_CODE_PTR:
-        return p
-    except Exception:
-      pass
+    return ""
+  if t.code not in USER_TYPE_CODES:
+    return None
+  return _find_ptr_field(t)
+
+def _find_ptr_field(t : gdb.Type) -> str | None:
+  # Looks through the type's fields rather than indexing the value by each
+  # name, as indexing by a missing name raises.  Bases are searched too, as
+  # indexing finds inherited members (e.g. MSVC's _Vector_iterator gets _Ptr
+  # from _Vector_const_iterator).
+  data_fields, _, base_fields, _ = _classify_fields(t)
+  found = {field.name: field for field in data_fields if field.name in _PTR_MEMBER_NAMES}
+  for name in _PTR_MEMBER_NAMES:
+    field = found.get(name)
+    if field is not None and field.type.strip_typedefs().code == gdb.TYPE_CODE_PTR:
+      return name
+  for field in base_fields:
+    name = _find_ptr_field(field.type.strip_typedefs())
+    if name is not None:
+      return name
   return None
 
 def _is_pointer(v):
   return v.type.strip_typedefs().code == gdb.TYPE_CODE_PTR
 
+_long_long_type : gdb.Type | None = None
+
+def _get_long_long_type() -> gdb.Type:
+  global _long_long_type
+  if _long_long_type is None:
+    _long_long_type = gdb.lookup_type("long long")
+  return _long_long_type
+
+def _forget_long_long_type() -> None:
+  # The type found may be the one in a program's debug info.
+  global _long_long_type
+  _long_long_type = None
+
+_type_cache_clears.append(_forget_long_long_type)
+
+def _type_key(t : gdb.Type) -> str | None:
+  """Key for caches of per-type information.  gdb.Type isn't hashable, and
+     str() runs gdb's type printer, so this is the type's name where it has
+     one.  Only unnamed types (e.g. pointers) are stringified.  Typedefs are
+     stripped so a type and its aliases share an entry.
+
+     None if the type involves an anonymous struct/union/enum, which all
+     print as "{...}" and so can't be told apart.  Those aren't cached.
+  """
+  t = t.strip_typedefs()
+  if t.name:
+    return t.name
+  type_str = str(t)
+  return None if "{...}" in type_str else type_str
+
+# (type code, type name) -> str() of the unqualified type.  A named type's
+# string only depends on its name and kind (in C a struct prints as
+# "struct name"), so gdb's type printer runs once per named type.  A pointer or
+# reference to an unqualified named type is keyed the same way by its target,
+# with its own code added, as those are most of the unnamed types printed.
+_type_str_cache : dict[tuple[int, str] | tuple[int, int, str], str] = _type_cache({})
+
+# Codes of the unnamed types _type_str() caches by their target's name.
+_TARGET_KEYED_CODES = frozenset((gdb.TYPE_CODE_PTR, gdb.TYPE_CODE_REF, gdb.TYPE_CODE_RVALUE_REF))
+
+def _type_str(t : gdb.Type) -> str:
+  """str(t.unqualified()), the string printers are matched against."""
+  name = t.name
+  if name is not None:
+    key : tuple[int, str] | tuple[int, int, str] = (t.code, name)
+  else:
+    code = t.code
+    if code not in _TARGET_KEYED_CODES:
+      return str(t.unqualified())
+    target = t.target()
+    target_name = target.name
+    # A cv-qualified target has the same name as its unqualified type, so
+    # only pointers to unqualified targets share a key.
+    if target_name is None or target != target.unqualified():
+      return str(t.unqualified())
+    key = (code, target.code, target_name)
+  type_str = _type_str_cache.get(key)
+  if type_str is None:
+    type_str = _type_str_cache[key] = str(t.unqualified())
+  return type_str
+
+# _type_key(pointer type) -> sizeof the type it points to
+_target_sizeof_cache : dict[str, int] = _type_cache({})
+
+def _target_sizeof(ptr_type : gdb.Type) -> int:
+  key = _type_key(ptr_type)
+  size = _target_sizeof_cache.get(key) if key is not None else None
+  if size is None:
+    size = ptr_type.strip_typedefs().target().sizeof
+    if key is not None:
+      _target_sizeof_cache[key] = size
+  return size
+
 def _to_int(v):
   try:
     return int(v)
   except Exception:
     try:
-      return int(v.cast(gdb.lookup_type("long long")))
+      return int(v.cast(_get_long_long_type()))
     except Exception:
       return int(str(v), 0)
 
+# Iterator capabilities found by probing with gdb's expression evaluator, keyed
+# by _type_key().  A type's capabilities can't change, so each type is only
+# probed once.  Cleared when new objfiles are loaded.
+_ra_range_cache : dict[tuple[str | None, str | None], bool] = _type_cache({})
+_ra_cache : dict[str | None, bool] = _type_cache({})
+_fwd_cache : dict[str | None, bool] = _type_cache({})
+_bidi_cache : dict[str | None, bool] = _type_cache({})
+
+# Template names of well known standard library iterator types, so those
+# don't need probing.  Probing a type that lacks an operation raises a
+# gdb.error, which is the expensive case.  Each category includes the ones
+# above it.
+_RA_TYPE_MARKERS = frozenset((
+  "__normal_iterator", "_Deque_iterator",            # libstdc++
+  "__wrap_iter", "__deque_iterator",                 # libc++
+  "_Vector_iterator", "_Vector_const_iterator",      # MSVC
+  "_Array_iterator", "_Array_const_iterator",
+  "_Deque_unchecked_iterator", "_Deque_const_iterator",
+))
+_BIDI_TYPE_MARKERS = _RA_TYPE_MARKERS | frozenset((
+  "_List_iterator", "_List_const_iterator",          # libstdc++, MSVC
+  "_Rb_tree_iterator", "_Rb_tree_const_iterator",
+  "__list_iterator", "__list_const_iterator",        # libc++
+  "__tree_iterator", "__tree_const_iterator", "__map_iterator", "__map_const_iterator",
+  "_Tree_iterator", "_Tree_const_iterator",          # MSVC
+))
+_FWD_TYPE_MARKERS = _BIDI_TYPE_MARKERS | frozenset((
+  "_Fwd_list_iterator", "_Fwd_list_const_iterator",  # libstdc++
+  "_Node_iterator", "_Node_const_iterator",
+  "__forward_list_iterator", "__forward_list_const_iterator", # libc++
+  "__hash_iterator", "__hash_const_iterator", "__hash_map_iterator", "__hash_map_const_iterator",
+  "_Flist_iterator", "_Flist_const_iterator",        # MSVC
+))
+
+_CV_PREFIXES = ("const ", "volatile ")
+
+def _template_name(type_str : str) -> str:
+  """The unscoped name of the outermost class or template in `type_str`, e.g.
+     "_List_iterator" for "const std::_List_iterator<std::pair<int, int> >".
+     Only that is compared against the markers, so iterator types that are
+     template arguments of another type don't decide its category.
+  """
+  while type_str.startswith(_CV_PREFIXES):
+    type_str = type_str.partition(" ")[2]
+  return type_str.partition("<")[0].rpartition("::")[2].strip()
+
+def _has_marker(type_str : str | None, markers : frozenset[str]) -> bool:
+  return type_str is not None and _template_name(type_str) in markers
+
 def _has_random_access(begin, end):
+  key = (_type_key(begin.type), _type_key(end.type))
+  result = _ra_range_cache.get(key)
+  if result is not None:
+    return result
+  if _has_marker(key[0], _RA_TYPE_MARKERS) and _has_marker(key[1], _RA_TYPE_MARKERS):
+    _ra_range_cache[key] = True
+    return True
   try:
-    with GdbConvenienceVars(("pp_b", begin), ("pp_e", end)):
+    with GdbConvenienceVars(("__pp_b", begin), ("__pp_e", end)):
       # If both compile/evaluate, we're RA.
-      gdb.parse_and_eval("$pp_e - $pp_b")
-      gdb.parse_and_eval("$pp_b + 1")
-      return True
+      gdb.parse_and_eval("$__pp_e - $__pp_b")
+      gdb.parse_and_eval("$__pp_b + 1")
+      result = True
   except gdb.error:
-    return False
+    result = False
+  if None not in key:
+    _ra_range_cache[key] = result
+  return result
 
 def _is_random_access(it):
+  key = _type_key(it.type)
+  result = _ra_cache.get(key)
+  if result is not None:
+    return result
+  if _has_marker(key, _RA_TYPE_MARKERS):
+    _ra_cache[key] = True
+    return True
   try:
-    with GdbConvenienceVars(("pp_it", it)):
-      gdb.parse_and_eval("$pp_it + 1")  # addition on a copy
-      return True
+    with GdbConvenienceVars(("__pp_probe", it)):
+      gdb.parse_and_eval("$__pp_probe + 1")  # addition on a copy
+      result = True
   except gdb.error:
-    return False
+    result = False
+  if key is not None:
+    _ra_cache[key] = result
+  return result
 
 def _is_forward(it):
+  key = _type_key(it.type)
+  result = _fwd_cache.get(key)
+  if result is not None:
+    return result
+  # Each category includes the ones above it, so a type already found to be
+  # bidirectional or random access doesn't need probing.
+  if _has_marker(key, _FWD_TYPE_MARKERS) or _bidi_cache.get(key) or _ra_cache.get(key):
+    _fwd_cache[key] = True
+    return True
   try:
-    with GdbConvenienceVars("pp_it", it):
-      gdb.parse_and_eval("++$pp_it")  # pre-increment on a copy
-      return True
+    with GdbConvenienceVars(("__pp_probe", it)):
+      gdb.parse_and_eval("++$__pp_probe")  # pre-increment on a copy
+      result = True
   except gdb.error:
-    return False
+    result = False
+  if key is not None:
+    _fwd_cache[key] = result
+  return result
 
 def _is_bidirectional(it):
+  key = _type_key(it.type)
+  result = _bidi_cache.get(key)
+  if result is not None:
+    return result
+  if _has_marker(key, _BIDI_TYPE_MARKERS) or _ra_cache.get(key):
+    _bidi_cache[key] = True
+    return True
   try:
-    with GdbConvenienceVars("pp_it", it):
-      gdb.parse_and_eval("--$pp_t")   # pre-decrement on a copy
-      return True
+    with GdbConvenienceVars(("__pp_probe", it)):
+      gdb.parse_and_eval("--$__pp_probe")  # pre-decrement on a copy
+      result = True
   except gdb.error:
-    return False
+    result = False
+  if key is not None:
+    _bidi_cache[key] = result
+  return result
 
 def call0(val, method):
-  with GdbConvenienceVars(("pp_self", val)):
-    return int(gdb.parse_and_eval(f"$pp_self.{method}()"))
+  with GdbConvenienceVars(("__pp_self", val)):
+    return int(gdb.parse_and_eval(f"$__pp_self.{method}()"))
 
 def get_member_value(val, member_name, adjust_return_type=lambda t: t):
   """Get value from member.  If member is a function, execute function with 0
@@ -235,30 +587,62 @@ def get_member_value(val, member_name, adjust_return_type=lambda t: t):
       returns the value unchanged.  Only affects if value is retrieved from
       object.
   """
-  member = None
+  t = val.type
+  key = _type_key(t)
+  cache_key = (key, member_name) if key is not None else None
+  entry = _member_kind_cache.get(cache_key) if cache_key is not None else None
+  kind = entry[1] if entry is not None and entry[0] == t else None
+
+  # A member declared by val's own type is read directly.
+  if kind is None:
+    try:
+      data_fields, static_fields, _, _ = _classify_fields(t)
+      if any(field.name == member_name for field in data_fields) or \
+         any(field.name == member_name for field in static_fields):
+        kind = _MEMBER_FIELD
+    except Exception as e:
+      log("get_member_value field lookup exception: %s", e)
+  if kind == _MEMBER_FIELD:
+    if cache_key is not None:
+      _member_kind_cache[cache_key] = (t, kind)
+    return val[member_name]
+
+  # Otherwise it's most likely a member function, so call it.  Calling it
+  # directly avoids "address of method" errors on overloads.
+  if kind is None or kind == _MEMBER_CALL:
+    try:
+      with GdbConvenienceVars(("__pp_self", val)):
+        res = gdb.parse_and_eval(f"$__pp_self.{member_name}()")
+      if cache_key is not None:
+        _member_kind_cache[cache_key] = (t, _MEMBER_CALL)
+      return adjust_return_type(res)
+    except Exception as e:
+      log("get_member_value call exception: %s ; trying member %s", e, member_name)
+
+  # Or a data member inherited from a base class.
   try:
     member = val[member_name]
-    if member.type.strip_typedefs().code == gdb.TYPE_CODE_FUNC:
-      try:
-        log(f"get_member_value calling function member {member_name}()")
-        return adjust_return_type(member())
-      except Exception as e:
-        log(f"get_member_value call exception: {e}\n  {traceback.format_exc()}")
-        return None
+    code = member.type.strip_typedefs().code
+    # A method only gets here if calling it failed, which may not happen next
+    # time (e.g. the inferior wasn't running), so that isn't remembered.
+    if cache_key is not None and code != gdb.TYPE_CODE_METHOD:
+      _member_kind_cache[cache_key] = (t, _MEMBER_INDEXED)
+    if code == gdb.TYPE_CODE_FUNC:
+      log("get_member_value calling function member %s()", member_name)
+      return adjust_return_type(member())
+    return member
   except Exception as e:
-    # Fallback: call it directly, avoids "address of method" on overloads
-    log(f"get_member_value exception: {e} ; trying call {member_name}()")
-    try:
-      with GdbConvenienceVars(("pp_self", val)):
-        res = gdb.parse_and_eval(f"$pp_self.{member_name}()")
-        return adjust_return_type(res)
-    except Exception as e2:
-      log(f"get_member_value fallback exception: {e2}")
-      try:
-        return adjust_return_type(call0(val, member_name))
-      except Exception as e3:
-        log(f"get_member_value call0 exception: {e3}")
-        return None
+    log("get_member_value member exception: %s\n  %s", e, _TRACEBACK)
+    return None
+
+# How get_member_value() found a member of a type, so later calls for the same
+# (_type_key(type), member name) go straight to it instead of testing the
+# fields or letting a failed call raise first.  Stored with the type it was
+# found for, so a different type of the same name looks it up again.
+_MEMBER_FIELD = 0   # declared by the type: val[name]
+_MEMBER_CALL = 1    # member function: $__pp_self.name()
+_MEMBER_INDEXED = 2 # anything else val[name] finds, e.g. an inherited member
+_member_kind_cache : dict[tuple[str, str], tuple[gdb.Type, int]] = _type_cache({})
 
 def get_c_range_and_size(val, begin_member_name, end_member_name, size_member_name=None):
   """ Get (begin, end) gdb.Values from a container-like `val` """
@@ -271,10 +655,18 @@ def get_c_range_and_size(val, begin_member_name, end_member_name, size_member_na
 
   return (begin, end)
 
+# Convenience variables only this module sets, and only for the length of one
+# evaluation (they aren't held across a yield).  GdbConvenienceVars doesn't
+# read their previous values, it just unsets them on exit, so they're named
+# with a leading "__" to keep clear of variables a user may have set.
+_PRIVATE_VARS = frozenset(("__pp_self", "__pp_b", "__pp_e", "__pp_probe"))
+
 class GdbConvenienceVars:
   """Scoped convenience vars: sets on enter, restores/removes on exit."""
 
-  _saved : list[tuple[str, gdb.Value | None]]
+  __slots__ = ("_saved",)
+
+  _saved : tuple[tuple[str, gdb.Value | None], ...]
 
   def __init__(self, *name_value_pairs : tuple[str, gdb.Value]):
     """Use within a with statement to setup gdb convenience variables by
@@ -293,13 +685,14 @@ class GdbConvenienceVars:
         Convenience variables should not start with a $.  Prefixing with a $ is
         only needed within a gdb.parse_and_eval() parameter list.
     """
-    self._saved = []
-
-    for name, value in name_value_pairs:
+    for name, _ in name_value_pairs:
       if name[0] == "$":
         raise ValueError("Convenience variable shouldn't start with $ unless used in gdb.parse_and_eval()")
-      prev = gdb.convenience_variable(name)  # None if not set
-      self._saved.append((name, prev))
+
+    # None if not set, which unsets it again on exit
+    self._saved = tuple((name, None if name in _PRIVATE_VARS else gdb.convenience_variable(name))
+                        for name, _ in name_value_pairs)
+    for name, value in name_value_pairs:
       gdb.set_convenience_variable(name, value)
 
   def __enter__(self):
@@ -309,6 +702,10 @@ class GdbConvenienceVars:
     for name, prev in self._saved:
       gdb.set_convenience_variable(name, prev)
 
+# Pointer ranges with at most this many elements have their chunk nodes built
+# into a list up front instead of being generated one at a time.
+_EAGER_CHUNK_LIMIT = 1024
+
 def emit_chunked_elements(c_range_and_size, chunk_size=16):
   """Emit elements of a pointer or iterator in chunks of given size.
 
@@ -320,39 +717,108 @@ def emit_chunked_elements(c_range_and_size, chunk_size=16):
   chunk_size : int, optional
       Maximum chunk size, by default 16
 
-  Yields
-  ------
-  tuple[str, gdb.Value]
-      tuple of chunk range description and corresponding synthetic tag
+  Returns
+  -------
+  Iterable[tuple[str, gdb.Value]]
+      tuples of chunk range description and corresponding synthetic tag.  A
+      list for small pointer ranges, otherwise a generator.
   """
-  begin, end = c_range_and_size
+  begin, end = c_range_and_size[0], c_range_and_size[1]
   size = None
   if len(c_range_and_size) > 2:
     size = c_range_and_size[2]
 
   try:
-    # 1) Pointer-like fast path (unwrap if possible)
-    b_ptr = _unwrap_ptr_like(begin)
-    e_ptr = _unwrap_ptr_like(end)
-    if b_ptr is not None and e_ptr is not None:
-      length = int(size) if size is not None else _to_int(e_ptr - b_ptr)
-      for i in range(0, length, chunk_size):
-        n = chunk_size if i + chunk_size <= length else (length - i)
-        yield f"[{i}..{i+n-1}]", make_enums_tag(b_ptr + i, _CHUNK_ENUM(i, n))
-      return
+    key = (_type_key(begin.type), _type_key(end.type))
+    emitter = _chunk_emitter_cache.get(key)
+    if emitter is None:
+      emitter = _pick_chunk_emitter(begin, end)
+      if None not in key:
+        _chunk_emitter_cache[key] = emitter
+  except Exception as e:
+    log("emit_chunked_elements exception: %s\n  %s", e, _TRACEBACK)
+    return []
+  return emitter(begin, end, size, chunk_size)
 
-    # 2) Random-access iterators via C++ evaluator
-    if _has_random_access(begin, end):
-      with GdbConvenienceVars(("_b", begin), ("_e", end)):
-        length = int(size) if size is not None else _to_int(gdb.parse_and_eval("$_e - $_b"))
-        for i in range(0, length, chunk_size):
-          n = chunk_size if i + chunk_size <= length else (length - i)
-          it_i = gdb.parse_and_eval(f"$_b + {i}")
-          yield f"[{i}..{i+n-1}]", make_enums_tag(it_i, _CHUNK_ENUM(i, n))
-      return
+ChunkEmitter : TypeAlias = Callable[[gdb.Value, gdb.Value, Any, int], Iterable[PrinterChild]]
+
+# (_type_key(begin), _type_key(end)) -> the emitter for that kind of range.  How
+# a range is walked depends only on its iterator types, so they are only
+# classified the first time they're seen.
+_chunk_emitter_cache : dict[tuple[str | None, str | None], ChunkEmitter] = _type_cache({})
+
+def _pick_chunk_emitter(begin : gdb.Value, end : gdb.Value) -> ChunkEmitter:
+  if _unwrap_ptr_like(begin) is not None and _unwrap_ptr_like(end) is not None:
+    return _emit_pointer_range
+  if _has_random_access(begin, end):
+    return _emit_random_access_range
+  return _emit_forward_range
+
+def _emit_pointer_range(begin : gdb.Value, end : gdb.Value, size, chunk_size : int):
+  try:
+    b_ptr = cast(gdb.Value, _unwrap_ptr_like(begin))
+    e_ptr = cast(gdb.Value, _unwrap_ptr_like(end))
+    length = int(size) if size is not None else \
+      (int(e_ptr) - int(b_ptr)) // _target_sizeof(b_ptr.type)
+    if length <= _EAGER_CHUNK_LIMIT:
+      return list(_emit_pointer_chunks(b_ptr, length, chunk_size))
+    return _emit_pointer_chunks_logged(b_ptr, length, chunk_size)
+  except Exception as e:
+    log("emit_chunked_elements exception: %s\n  %s", e, _TRACEBACK)
+    return []
+
+def _emit_pointer_chunks(b_ptr : gdb.Value, length : int, chunk_size : int):
+  if length <= 0:
+    return
+  # A tag needs an lvalue, so each chunk is tagged by its first element,
+  # indexed out of the range viewed as one T[length] array.
+  elem_type = b_ptr.type.strip_typedefs().target()
+  elems = b_ptr.dereference().cast(elem_type.array(length - 1))
+  tag = enums_type_tagger(elem_type)
+  full_chunks, tail = divmod(length, chunk_size)
+  for i in range(0, full_chunks * chunk_size, chunk_size):
+    yield f"[{i}..{i+chunk_size-1}]", tag(elems[i], _CHUNK_ENUM(i, chunk_size))
+  if tail:
+    i = full_chunks * chunk_size
+    yield f"[{i}..{length-1}]", tag(elems[i], _CHUNK_ENUM(i, tail))
+
+def _emit_pointer_chunks_logged(b_ptr : gdb.Value, length : int, chunk_size : int):
+  try:
+    yield from _emit_pointer_chunks(b_ptr, length, chunk_size)
+  except Exception as e:
+    log("emit_chunked_elements exception: %s\n  %s", e, _TRACEBACK)
 
-    # 3) Forward / bidirectional: scan from begin to end (or until `size`)
-    with GdbConvenienceVars(("_it", begin), ("_end", end)):
+def _emit_random_access_range(begin : gdb.Value, end : gdb.Value, size, chunk_size : int):
+  try:
+    # gdb.Value arithmetic calls the iterator's operator-/operator+ without
+    # parsing an expression each time.
+    b_ptr = _unwrap_ptr_like(begin)
+    e_ptr = _unwrap_ptr_like(end) if size is None and b_ptr is not None else None
+    if size is not None:
+      length = int(size)
+    elif e_ptr is not None:
+      # Both wrap a T*, so the distance is plain address arithmetic.
+      length = (int(e_ptr) - int(b_ptr)) // _target_sizeof(b_ptr.type)
+    else:
+      length = _to_int(end - begin)
+    for i in range(0, length, chunk_size):
+      n = chunk_size if i + chunk_size <= length else (length - i)
+      if b_ptr is not None:
+        yield f"[{i}..{i+n-1}]", make_enums_tag((b_ptr + i).dereference(), _CHUNK_ENUM(i, n))
+      else:
+        yield f"[{i}..{i+n-1}]", make_enums_tag(begin + i, _ITER_CHUNK_ENUM(i, n))
+  except gdb.error as e:
+    log("emit_chunked_elements gdb.error: %s\n  %s", e, _TRACEBACK)
+  except Exception as e:
+    log("emit_chunked_elements exception: %s\n  %s", e, _TRACEBACK)
+
+def _emit_forward_range(begin : gdb.Value, end : gdb.Value, size, chunk_size : int):
+  try:
+    # Scan from begin to end (or until `size`).  gdb.Value has no ++ and can't
+    # call a class's operator==, so the evaluator is still needed, but each
+    # chunk is advanced with a single comma expression rather than one
+    # parse_and_eval() per element.
+    with GdbConvenienceVars(("_it", begin), ("_end", end), ("_steps", gdb.Value(0))):
       def _at_end():
         # If the iterator type doesn't support ==, this will throw; we then
         # rely purely on `size`.
@@ -365,54 +831,96 @@ def emit_chunked_elements(c_range_and_size, chunk_size=16):
       have_size = size is not None
       total = int(size) if have_size else None
 
-      while have_size and i < total or not have_size and not _at_end():
+      # Only checked up front.  After that a chunk stopping short of `limit`
+      # means the end was reached, so no separate check is parsed per chunk.
+      at_end = not have_size and _at_end()
+      while have_size and i < total or not have_size and not at_end:
         start_it = gdb.parse_and_eval("$_it")  # snapshot at chunk start
-        steps = 0
         limit = chunk_size if not have_size else min(chunk_size, total - i)
 
         # advance up to `limit` or until `end`
-        while steps < limit:
-          if not have_size and _at_end():
-            break
-          gdb.parse_and_eval("++$_it")
-          steps += 1
+        if have_size:
+          gdb.parse_and_eval(", ".join(["++$_it"] * limit))
+          steps = limit
+        else:
+          steps = _to_int(gdb.parse_and_eval(
+            "$_steps = 0, " +
+            ", ".join(["($_it == $_end) ? 0 : (++$_it, ++$_steps)"] * limit) +
+            ", $_steps"))
+          at_end = steps < limit
 
         if steps == 0:  # nothing advanced (size too big or already at end)
           break
 
-        yield f"[{i}..{i+steps-1}]", make_enums_tag(start_it, _CHUNK_ENUM(i, steps))
+        yield f"[{i}..{i+steps-1}]", make_enums_tag(start_it, _ITER_CHUNK_ENUM(i, steps))
         i += steps
 
   except gdb.error as e:
-    log(f"emit_chunked_elements gdb.error: {e}\n  {traceback.format_exc()}")
+    log("emit_chunked_elements gdb.error: %s\n  %s", e, _TRACEBACK)
   except Exception as e:
-    log(f"emit_chunked_elements exception: {e}\n  {traceback.format_exc()}")
+    log("emit_chunked_elements exception: %s\n  %s", e, _TRACEBACK)
 
 def emit_elements(it : gdb.Value, offset : int, size : int):
   """ Emit elements of an iterator one by one, up to `size` elements,
       showing starting at `offset` """
+  if size <= 0:
+    return
   try:
-    with GdbConvenienceVars(("pp_it", it)):
-      i = 0
+    ptr = _unwrap_ptr_like(it)
+    if ptr is not None:
+      yield from _emit_pointer_elements(ptr, offset, size)
+      return
 
-      # emit up to size elements
-      while i < size:
-        yield f"[{offset + i}]", gdb.parse_and_eval("$pp_it").dereference()
-        gdb.parse_and_eval("++$pp_it")
-        i += 1
+    # Other iterators need their operator++ and operator*, so one expression
+    # both advances and dereferences.
+    with GdbConvenienceVars(("pp_it", it)):
+      yield f"[{offset}]", gdb.parse_and_eval("*$pp_it")
+      for i in range(1, size):
+        yield f"[{offset + i}]", gdb.parse_and_eval("*++$pp_it")
 
   except gdb.error as e:
-    log(f"emit_elements gdb.error: {e}\n  {traceback.format_exc()}")
+    log("emit_elements gdb.error: %s\n  %s", e, _TRACEBACK)
   except Exception as e:
-    log(f"emit_elements exception: {e}\n  {traceback.format_exc()}")
+    log("emit_elements exception: %s\n  %s", e, _TRACEBACK)
+
+def _emit_pointer_elements(ptr : gdb.Value, offset : int, size : int):
+  """ emit_elements() for a T*.  The range is read by indexing it viewed as
+      one T[size] array, which doesn't go through gdb's expression parser. """
+  if size <= 0:
+    return
+  elems = ptr.dereference().cast(ptr.type.strip_typedefs().target().array(size - 1))
+  for i in range(size):
+    yield f"[{offset + i}]", elems[i]
 
 import inspect
 from inspect import Parameter
 
-Arity = tuple[int, Union[int, float], set[str], bool, bool]
+Arity = tuple[int, Union[int, float], frozenset[str], bool, bool]
+
+# (function, is bound method) -> its arity.  inspect.signature() is slow and
+# arity() is called for every summary and nested to_string(), so each callable
+# is only inspected once.  Bound methods are keyed by their function, as the
+# method has the same signature whichever instance it's bound to.  Holds at
+# most _ARITY_CACHE_MAX callables, dropping the oldest past that, so callables
+# made on the fly (e.g. lambdas) don't grow it without bound.
+_ARITY_CACHE_MAX = 1024
+_arity_cache : dict[tuple[Callable[..., Any], bool], Arity] = {}
 
 def arity(fn : Callable[..., Any]) -> Arity:
   """Return (min_positional, max_positional, required_kwonly, has_varargs, has_varkw)."""
+  func = getattr(fn, "__func__", None)
+  key = (func, True) if func is not None else (fn, False)
+  try:
+    result = _arity_cache.get(key)
+  except TypeError:
+    return _arity(fn) # unhashable callable
+  if result is None:
+    if len(_arity_cache) >= _ARITY_CACHE_MAX:
+      del _arity_cache[next(iter(_arity_cache))]
+    result = _arity_cache[key] = _arity(fn)
+  return result
+
+def _arity(fn : Callable[..., Any]) -> Arity:
   sig = inspect.signature(fn)
   min_pos = max_pos = 0
   has_varargs = has_varkw = False
@@ -434,10 +942,62 @@ def arity(fn : Callable[..., Any]) -> Arity:
 
   if has_varargs:
     max_pos = float("inf")
-  return min_pos, max_pos, required_kwonly, has_varargs, has_varkw
-
-CHAR_TYPES = (gdb.lookup_type("char"), gdb.lookup_type("unsigned char"))
-USER_TYPE_CODES = (gdb.TYPE_CODE_STRUCT, gdb.TYPE_CODE_UNION)
+  return min_pos, max_pos, frozenset(required_kwonly), has_varargs, has_varkw
+
+# Names of the types summary() shows as numbers when show_char_as_int is set.
+# Matched by name, which is cheaper than gdb.Type's deep equality check.
+CHAR_TYPE_NAMES = frozenset(("char", "unsigned char"))
+USER_TYPE_CODES = frozenset((gdb.TYPE_CODE_STRUCT, gdb.TYPE_CODE_UNION))
+
+# (data fields, static fields, base class fields, (node name, reference type)
+# of each named base class to show it as)
+FieldClassification : TypeAlias = tuple[list[gdb.Field], list[gdb.Field], list[gdb.Field],
+                                        list[tuple[str, gdb.Type]]]
+
+# _type_key(type) -> (the type, its FieldClassification).  The type is kept so
+# a different type of the same name isn't given its fields.
+_field_classification_cache : dict[str, tuple[gdb.Type, FieldClassification]] = _type_cache({})
+
+def _classify_fields(t : gdb.Type) -> FieldClassification:
+  """Splits the fields of a type into non-static data members, static members
+     and base classes, each kept in declaration order.  Walks t.fields() only
+     the first time a type is seen.
+  """
+  key = _type_key(t)
+  entry = _field_classification_cache.get(key) if key is not None else None
+  if entry is not None and entry[0] == t:
+    classified = entry[1]
+  else:
+    data_fields : list[gdb.Field] = []
+    static_fields : list[gdb.Field] = []
+    base_fields : list[gdb.Field] = []
+    for field in t.fields():
+      # is_base_class is always set, but static members have no bitpos.
+      if field.is_base_class:
+        base_fields.append(field)
+      elif getattr(field, "bitpos", None) is None:
+        static_fields.append(field)
+      else:
+        data_fields.append(field)
+    # The field already carries the base's type, so no lookup by name.
+    base_nodes = [(f"{field.name} (base)", field.type.reference())
+                  for field in base_fields if field.name is not None]
+    classified = (data_fields, static_fields, base_fields, base_nodes)
+    if key is not None:
+      _field_classification_cache[key] = (t, classified)
+  return classified
+
+_NO_FIELDS : FieldClassification = ([], [], [], [])
+
+def _value_to_str(v : gdb.Value, max_len : int) -> str:
+  """str(v), except that a printer whose to_string() takes a max_len is asked
+     for at most `max_len` characters, so a nested value isn't formatted in
+     full only to be cut short.
+  """
+  printerObj = cast(Optional[PrinterLike], gdb.default_visualizer(v))
+  if printerObj and arity(printerObj.to_string)[1] == 1:
+    return str(printerObj.to_string(max(0, max_len)))
+  return str(v)
 
 def summary(named : bool = False, show_type : bool = True, show_char_as_int : bool = True) \
   -> Callable[[gdb.Value, int], str]:
@@ -455,18 +1015,15 @@ def summary(named : bool = False, show_type : bool = True, show_char_as_int : bo
       represent showing up after the numeric value).
 
   """
-  summary : str = ""
+  # Length of the summary built so far, before the field being converted.
+  summary_len = 0
   def v_to_str(v : gdb.Value, max_len : int):
-    printerObj = cast(Optional[PrinterLike], gdb.default_visualizer(v))
-    if printerObj and arity(printerObj.to_string)[1] == 1:
-      # subtracting 2 because there is an implicit ", " that is put before this.
-      return printerObj.to_string(max(0, max_len - len(summary) - 2))
-    else:
-      return str(v)
+    # subtracting 2 because there is an implicit ", " that is put before this.
+    return _value_to_str(v, max_len - summary_len - 2)
 
   if show_char_as_int:
     def val_to_str(v : gdb.Value, max_len : int): # type: ignore[reportRedeclaration]
-      return str( _to_int(v) if v.type in CHAR_TYPES else v_to_str(v, max_len) )
+      return str( _to_int(v) if v.type.strip_typedefs().name in CHAR_TYPE_NAMES else v_to_str(v, max_len) )
   else:
     def val_to_str(v : gdb.Value, max_len : int):
       return v_to_str(v, max_len)
@@ -475,8 +1032,9 @@ def summary(named : bool = False, show_type : bool = True, show_char_as_int : bo
     def field_entry(v : gdb.Value, f : gdb.Field, max_len : int): # type: ignore[reportRedeclaration]
       if f.name is None:
         return "* unnamed field *"
-      log(f"name: {f.name} type: {v[f.name].type}")
-      return f.name + "=" + str(val_to_str(v[f.name], max_len))
+      member = v[f.name]
+      log("name: %s type: %s", f.name, member.type)
+      return f.name + "=" + str(val_to_str(member, max_len))
   else:
     def field_entry(v : gdb.Value, f : gdb.Field, max_len : int):
       if f.name is None:
@@ -484,44 +1042,33 @@ def summary(named : bool = False, show_type : bool = True, show_char_as_int : bo
       return val_to_str(v[f.name], max_len)
     
   def summary_fn(val : gdb.Value, max_len : int = MAX_SUMMARY_LEN) -> str:
-    nonlocal summary
+    nonlocal summary_len
     try:
-      fields = val.type.fields()
-      summary = "{ "
-      field_count = 0
-      # get first non base class/static member
-      i = 0
-      for i in range(len(fields)):
-        field = fields[i]
-        if (getattr(field, "is_base_class", False) is False and getattr(field, "bitpos", False)) is not False:
-          log(f"first: {field.name} len: {len(summary)} max_len: {max_len}")
-          if len(summary) >= max_len:
-            summary = "{...}"
-            log("aborting...")
-            break
-          summary += str(field_entry(val, field, max_len))
-          field_count += 1
+      parts : list[str] = []
+      length = 2 # "{ "
+      for field in _classify_fields(val.type)[0]:
+        log("[%d]: %s len: %d max_len: %d", len(parts), field.name, length, max_len)
+        if length >= max_len:
+          parts.append("...")
+          log("aborting...")
           break
-
-      if summary != "{...}":
-        # get rest non base class/static members
-        for field_i in range(i+1, len(fields)):
-          field = fields[field_i]
-          if (getattr(field, "is_base_class", False) is False and getattr(field, "bitpos", False)) is not False:
-            log(f"[{field_i}]: {field.name} len: {len(summary)} max_len: {max_len}")
-            if len(summary) >= max_len:
-              summary += ", ..."
-              log("aborting...")
-              break
-            summary += ", " + field_entry(val, field, max_len)
-            field_count += 1
-
-        if (field_count):
-          summary += " }"
-        else:
-          summary = "{}"
+        if parts:
+          length += 2 # ", "
+        # Set per field, as field_entry() may recurse into this summary for a
+        # member of the same type.
+        summary_len = length
+        entry = str(field_entry(val, field, max_len))
+        parts.append(entry)
+        length += len(entry)
+
+      if parts == ["..."]:
+        summary = "{...}"
+      elif parts:
+        summary = "{ " + ", ".join(parts) + " }"
+      else:
+        summary = "{}"
     except Exception as e:
-      log(f"summary exception: {e}\n  {traceback.format_exc()}")
+      log("summary exception: %s\n  %s", e, _TRACEBACK)
       return f"<summary exception: {e}>"
 
     if show_type:
@@ -533,97 +1080,71 @@ def summary(named : bool = False, show_type : bool = True, show_char_as_int : bo
 def emit_raw_children(val : gdb.Value):
   """ Emit raw children of a gdb.Value if possible """
   try:
-    if val.type.code != gdb.TYPE_CODE_ARRAY:
-      for field in val.type.fields():
-        if field.name is None:
-          continue # unnamed field
-        if getattr(field, "is_base_class", False):
-          yield f"{field.name} (base)", val.cast(gdb.lookup_type(field.name).reference())
-        elif getattr(field, "bitpos", None) is not None:
-          yield field.name, val[field.name] # non-static field
+    t = val.type
+    if t.code != gdb.TYPE_CODE_ARRAY:
+      yield from _emit_raw_fields(val, _classify_fields(t))
   except Exception as e:
-    log(f"emit_raw_children exception: {e}\n  {traceback.format_exc()}")
+    log("emit_raw_children exception: %s\n  %s", e, _TRACEBACK)
     return
 
+def _emit_raw_fields(val : gdb.Value, classified : FieldClassification):
+  data_fields, _, _, base_nodes = classified
+  # gdb lists base classes before the members, so this keeps their order.
+  for name, ref_type in base_nodes:
+    yield name, val.cast(ref_type)
+  for field in data_fields:
+    if field.name is None:
+      continue # unnamed field
+    yield field.name, val[field.name]
+
+# (_type_key(type), field name) -> (the type, address of the static member, or
+# None if it has none, e.g. optimized out).  A static lives at the same address
+# for every instance, so only the first lookup goes through gdb's symbol
+# tables.  The address rather than the value is kept so each render reads
+# current memory, and the type so a different type of the same name doesn't
+# read another's static.
+_static_addr_cache : dict[tuple[str, str], tuple[gdb.Type, gdb.Value | None]] = _type_cache({})
+
+def _static_member(val : gdb.Value, t : gdb.Type, key : str | None, name : str) -> gdb.Value:
+  if key is None:
+    return val[name]
+  cache_key = (key, name)
+  entry = _static_addr_cache.get(cache_key)
+  if entry is None or entry[0] != t:
+    member = val[name]
+    _static_addr_cache[cache_key] = (t, member.address)
+    return member
+  addr = entry[1]
+  return val[name] if addr is None else addr.dereference()
+
 def emit_static_children(val : gdb.Value):
   """ Emit static children of a gdb.Value if any """
   try:
-    if val.type.code != gdb.TYPE_CODE_ARRAY:
-      for field in val.type.fields():
+    t = val.type
+    if t.code != gdb.TYPE_CODE_ARRAY:
+      key = _type_key(t)
+      for field in _classify_fields(t)[1]:
         if field.name is None:
           continue # unnamed field
-        if getattr(field, "bitpos", None) is not None:
-          continue # non-static field
-        yield field.name, val[field.name]
+        yield field.name, _static_member(val, t, key, field.name)
     return
   except Exception as e:
-    log(f"emit_raw_children exception: {e}\n  {traceback.format_exc()}")
+    log("emit_static_children exception: %s\n  %s", e, _TRACEBACK)
     return
 
-  t = val.type.strip_typedefs()
-  qual = t.tag or t.name
-  if not qual:
-    return
-
-  for f in t.fields():
-    if getattr(f, "is_base_class", False):
-      continue
-
-    # Prefer is_static when available; otherwise fall back to "no bitpos ⇒ static"
-    is_static = getattr(f, "is_static", None)
-    if is_static is None:
-      is_static = getattr(f, "bitpos", None) is None
-    if not is_static or not f.name:
-      continue
-
-    fullname = f"{qual}::{f.name}"
-    v = None
-    try:
-      sym = gdb.lookup_global_symbol(fullname)
-      if sym:
-        v = sym.value()
-    except gdb.error:
-      pass
-    if v is None:
-      try:
-        v = gdb.parse_and_eval(fullname)
-      except gdb.error:
-        v = None
-
-    yield f.name, v
-
 def has_static(val : gdb.Value):
   try:
-    for field in val.type.fields():
-      if getattr(field, "bitpos", None) is None:
-        return True
+    return bool(_classify_fields(val.type)[1])
   except Exception as e:
-    log(f"has_static exception for {val.type}: {e}\n  {traceback.format_exc()}")
-  return False
-
-  t = val.type.strip_typedefs()
-  qual = t.tag or t.name
-  if not qual:
-    return
-
-  for f in t.fields():
-    if getattr(f, "is_base_class", False):
-      continue
-
-    # Prefer is_static when available; otherwise fall back to "no bitpos ⇒ static"
-    is_static = getattr(f, "is_static", None)
-    if is_static is None:
-      is_static = getattr(f, "bitpos", None) is None
-    if not is_static or not f.name:
-      continue
-
-    return True
+    log("has_static exception for %s: %s\n  %s", val.type, e, _TRACEBACK)
   return False
 
 class MessagePrinter(gdb.ValuePrinter):
   """Allows a message to be on the rhs of =.  Not very useful I think as
      ArrayPrinter will do the same with a python string. Leaving here for now.
   """
+  __slots__ = ("val", "string")
+
   def __init__(self, val : gdb.Value, string : str) -> None:
     self.val = val
     self.string = string
@@ -659,6 +1180,8 @@ def _get_summary(summary : str | Callable[[gdb.Value], str] | Callable[[gdb.Valu
       finishes that field element, adds a ... to the end and stops processing
       the rest of the fields.
   """
+  if not _summaries_enabled:
+    return ""
   if callable(summary):
     if arity(summary)[1] == 2:
       summary = cast(Callable[[gdb.Value, int], str], summary)
@@ -669,71 +1192,130 @@ def _get_summary(summary : str | Callable[[gdb.Value], str] | Callable[[gdb.Valu
   else:
     return summary
 
+class _ViewInfo:
+  """A View's entries, read out of its dict once when its printer is added."""
+  __slots__ = ("view", "node", "nodes", "summary")
+
+  def __init__(self, view : View) -> None:
+    self.view = view
+    self.node = view.get("node")
+    # "node" takes precedence over "nodes"
+    self.nodes = view.get("nodes", ()) if self.node is None else ()
+    self.summary = view.get("summary")
+
+class _PrinterInfo:
+  """What DefaultPrinter needs from a Printer, worked out once when the printer
+     is added rather than for every value it prints.
+  """
+  __slots__ = ("printer", "views", "view_infos", "view_count", "views_by_name", "view_items",
+               "default_view_name", "default_view", "default_view_info", "summary", "error")
+
+  def __init__(self, printer : Optional[Printer]) -> None:
+    self.printer = printer
+    self.views : tuple[View, ...] = tuple(printer.get("views", ())) if printer is not None else ()
+    self.view_infos = tuple(_ViewInfo(view) for view in self.views)
+    self.view_count = len(self.views)
+    self.views_by_name : dict[str, View] = {}
+    for view in self.views:
+      if "name" in view:
+        self.views_by_name.setdefault(view["name"], view)
+    # (node name, tag enums) for each view
+    self.view_items = tuple((view.get("name", f"View {i}"), _VIEW_ENUM(i))
+                            for i, view in enumerate(self.views))
+    self.default_view_name = printer.get("default_view") if printer is not None else None
+    self.default_view = self.views_by_name.get(self.default_view_name) \
+      if self.default_view_name is not None else None
+    self.default_view_info = next(info for info in self.view_infos if info.view is self.default_view) \
+      if self.default_view is not None else None
+
+    # What to_string() shows, or None to show nothing.  A misnamed default_view
+    # is reported in `error` instead, which is shown even while summaries are
+    # turned off.
+    self.summary : Callable[[gdb.Value, int], str] | str | None = None
+    self.error : str | None = None
+    if self.view_count == 0 or self.default_view_name is None:
+      # no views, or no default_view: the raw type's summary
+      if printer is not None:
+        self.summary = printer.get("summary")
+    elif self.default_view is None:
+      self.error = f'<default_view "{self.default_view_name}" not defined>'
+      log("printer default_view %r not defined", self.default_view_name)
+    else:
+      # one default view: that view's summary if any
+      self.summary = self.default_view.get("summary")
+
+_NO_PRINTER_INFO = _PrinterInfo(None)
+
 class DefaultPrinter(gdb.ValuePrinter):
   """Handler for default pretty-printing of structs/unions/classes"""
-  def __init__(self, val : gdb.Value, printer : Optional[Printer] = None):
+  __slots__ = ("val", "printer", "_info", "_tag_nodes")
+
+  def __init__(self, val : gdb.Value, printer : Optional[Printer] = None,
+               info : Optional[_PrinterInfo] = None):
     self.val = val
-    self.printer = printer
+    # `info` is the _PrinterInfo already worked out for the printer when it was
+    # added.  A printer passed in directly has its info worked out here.
+    if info is None:
+      info = _PrinterInfo(printer) if printer is not None else _NO_PRINTER_INFO
+    self.printer = info.printer
+    self._info = info
+    # The <Static>/<Raw>/view nodes, made by the first children() call and
+    # yielded again by later ones.
+    self._tag_nodes : list[PrinterChild] | None = None
 
   def get_view_named(self, name : str):
-    if self.printer is not None and "views" in self.printer:
-      for view in self.printer["views"]:
-        if view["name"] == name:
-          return view
-    return None
+    return self._info.views_by_name.get(name)
 
   def to_string(self, max_len : int = MAX_SUMMARY_LEN):
     if max_len <= 0:
       return "..."
-    
-    view_count = self.count_views()
-    if self.printer is not None and "default_view" in self.printer:
-      default_view_name = self.printer["default_view"]
-      default_view = self.get_view_named(default_view_name)
-    else:
-      default_view_name = default_view = None
 
-    if view_count == 0 or default_view_name is None:
-      # no views, or no default_view: just show raw type's summary
-      if self.printer is not None and "summary" in self.printer:
-        return _get_summary(self.printer["summary"], self.val, max_len)
-    else:
-      # one default view: show that view's summary if any
-      if default_view is None:
-        return f'<default_view "{default_view_name}" not defined>'
-      if "summary" in default_view:
-        return _get_summary(default_view["summary"], self.val, max_len)
-
-    # view has no summary, or no views/printer: show nothing
-    return ""
+    info = self._info
+    summary = info.summary
+    if summary is None:
+      # view has no summary, or no views/printer: show nothing, unless the
+      # default_view is misnamed
+      return info.error or ""
+    return _get_summary(summary, self.val, max_len)
 
   def count_views(self):
-    if self.printer is not None and "views" in self.printer:
-      log(f"count_views for {self.val.type} = {len(self.printer["views"])}")
-      return len(self.printer["views"])
-    return 0
-
-  def view_name(self, index : int):
-    if self.printer is not None and "views" in self.printer and index < len(self.printer["views"]):
-      return self.printer["views"][index]["name"]
-    return f"View {index}"
+    view_count = self._info.view_count
+    log("count_views for %s = %d", self.val.type, view_count)
+    return view_count
 
   def children(self) -> PrinterChildren:
-    log(f"DefaultPrinter children for {self.val.type}\n{self.printer}")
+    val = self.val
+    t = val.type
+    log("DefaultPrinter children for %s\n%s", t, self.printer)
 
-    view_count = self.count_views()
-    if self.printer is not None and "default_view" in self.printer:
-      default_view_name = self.printer["default_view"]
-      default_view = self.get_view_named(default_view_name)
-    else:
-      default_view_name = default_view = None
+    info = self._info
+    view_count = info.view_count
+    default_view_name = info.default_view_name
+    default_view = info.default_view_info
+
+    # Classified once for both the raw members and the <Static> check.
+    try:
+      classified = _classify_fields(t) if t.code != gdb.TYPE_CODE_ARRAY else _NO_FIELDS
+    except Exception as e:
+      log("DefaultPrinter children exception for %s: %s\n  %s", t, e, _TRACEBACK)
+      classified = _NO_FIELDS
 
     # Show top-level view
-    log(f"count_views for {self.val.type} = {view_count}")
+    log("count_views for %s = %d", t, view_count)
     if view_count == 0 or default_view_name is None:
       # show raw members at top-level if no views or no default_view
-      log(f"top-level view for {self.val.type} = <Raw>")
-      yield from RawPrinter(self.val).children()
+      log("top-level view for %s = <Raw>", t)
+      # Walked here rather than through RawPrinter/_emit_raw_fields() so each
+      # member is yielded by this generator directly.
+      data_fields, _, _, base_nodes = classified
+      try:
+        for name, ref_type in base_nodes:
+          yield name, val.cast(ref_type)
+        for field in data_fields:
+          if field.name is not None:
+            yield field.name, val[field.name]
+      except Exception as e:
+        log("emit_raw_children exception: %s\n  %s", e, _TRACEBACK)
     else:
       # show default view at top-level
       if default_view is None:
@@ -768,58 +1350,76 @@ class DefaultPrinter(gdb.ValuePrinter):
         #       NOPE! Bastards marked gdb.Type as final!
         pass
       else:
-        log(f"top-level view for {self.val.type} = {default_view_name}")
-        yield from ViewPrinter(self.val, default_view).children()
+        log("top-level view for %s = %s", t, default_view_name)
+        yield from ViewPrinter(val, default_view).children()
 
     # Show static/raw/views views
-    if has_static(self.val):
-      log(f"has_static for {self.val.type}")
-      yield "<Static>", make_enums_tag(self.val, _STATIC_ENUM)
-
-    if view_count > 0:
+    tag_nodes = self._tag_nodes
+    if tag_nodes is None:
+      tag_nodes = self._tag_nodes = self._make_tag_nodes(t, bool(classified[1]))
+    yield from tag_nodes
+
+  def _make_tag_nodes(self, t : gdb.Type, has_static : bool) -> list[PrinterChild]:
+    info = self._info
+    default_view_name = info.default_view_name
+    tag = enums_tagger(self.val)
+    tag_nodes : list[PrinterChild] = []
+    if has_static:
+      log("has_static for %s", t)
+      tag_nodes.append(("<Static>", tag(_STATIC_ENUM)))
+
+    if info.view_count > 0:
       if default_view_name is not None:
         # show <Raw> tag if there are views and a default_view
-        yield "<Raw>", make_enums_tag(self.val, _RAW_ENUM)
+        tag_nodes.append(("<Raw>", tag(_RAW_ENUM)))
 
       # show views other than default_view
-      for i in range(view_count):
-        view_name = self.view_name(i)
+      for view_name, view_enum in info.view_items:
         if view_name != default_view_name:
-          yield f"<{view_name}>", make_enums_tag(self.val, _VIEW_ENUM(i))
+          tag_nodes.append((f"<{view_name}>", tag(view_enum)))
+    return tag_nodes
 
 class ArrayPrinter(gdb.ValuePrinter):
+  __slots__ = ("val", "low", "high", "n", "char_array", "python_string", "summary")
+
   def __init__(self, val : gdb.Value) -> None:
     self.val = val
-    self.python_string = False
 
     t = self.val.type.strip_typedefs().unqualified()
     self.low, self.high = self.val.type.range()
     self.n = self.high - self.low + 1
-    if t.target().unqualified() in CHAR_TYPES:
-      self.summary = self.val.lazy_string(length=self.n)  # GDB handles quotes/escaping
-      if str(self.summary) == "<error: Cannot access memory at address 0x0>":
-        # This is a python string so don't quote it
-        self.summary = self.val.string(length=self.n)
-        self.python_string = True
-    elif self.n == 0:
-      self.summary = ""
-    else:
-      self.summary = None
+    self.char_array = t.target().strip_typedefs().name in CHAR_TYPE_NAMES
+    # A python string yielded as a child isn't in the inferior's memory, so
+    # there's no address to read a lazy string from.
+    self.python_string = self.char_array and not self.val.address
+    # Built on the first to_string() call, as it may never be shown.
+    self.summary = "" if self.n == 0 and not self.char_array else None
 
   def to_string(self, max_len : int = MAX_SUMMARY_LEN):
-    if self.summary is None:
+    if self.summary is None and self.char_array:
+      if self.python_string:
+        # This is a python string so don't quote it
+        self.summary = self.val.string(length=self.n)
+      else:
+        self.summary = self.val.lazy_string(length=self.n)  # GDB handles quotes/escaping
+    elif self.summary is None:
       self.summary = f"length = {self.n} "
       if self.n == 0:
         array = "[]"
       else:
-        array = "[ " + str(self.val[self.low])
-        for i in range(self.low + 1, self.high):
-          if len(array) > max_len:
-            array += ", ..."
+        # Each element is only given what's left of max_len, so the work done
+        # is bounded by max_len rather than by the elements' full text.
+        parts = [_value_to_str(self.val[self.low], max_len - 2)]
+        length = 2 + len(parts[0]) # "[ "
+        for i in range(self.low + 1, self.high + 1):
+          if length > max_len:
+            parts.append("...")
             break
 
-          array += f", {self.val[i]}"
-        array += " ]"
+          elem = _value_to_str(self.val[i], max_len - length - 2)
+          parts.append(elem)
+          length += 2 + len(elem) # ", "
+        array = "[ " + ", ".join(parts) + " ]"
       self.summary += array
     return self.summary
 
@@ -832,23 +1432,28 @@ class ArrayPrinter(gdb.ValuePrinter):
 
 class StaticPrinter(gdb.ValuePrinter):
   """Handler for static members"""
+  __slots__ = ("val",)
+
   def __init__(self, val : gdb.Value):
     self.val = val
 
   def children(self) -> PrinterChildren:
-    yield from emit_static_children(self.val)
+    # Handed over as is rather than wrapped in another generator.
+    return emit_static_children(self.val)
 
   def to_string(self, _ : int = MAX_SUMMARY_LEN):
     return ""
 
 class RawPrinter(gdb.ValuePrinter):
   """Handler for raw view of members"""
+  __slots__ = ("val", "printer")
+
   def __init__(self, val : gdb.Value, printer : Printer | None = None):
     self.val = val
     self.printer = printer
 
   def children(self) -> PrinterChildren:
-    yield from emit_raw_children(self.val)
+    return emit_raw_children(self.val)
 
   def to_string(self, max_len : int = MAX_SUMMARY_LEN):
     if self.printer is not None and "summary" in self.printer:
@@ -857,26 +1462,30 @@ class RawPrinter(gdb.ValuePrinter):
 
 class ViewPrinter(gdb.ValuePrinter):
   """Handler for a specific view of members"""
-  def __init__(self, val : gdb.Value, view : View):
+  __slots__ = ("val", "view")
+
+  def __init__(self, val : gdb.Value, view : _ViewInfo):
     self.val = val
     self.view = view
 
   def children(self) -> PrinterChildren:
-    if "node" in self.view:
-      log(f"ViewPrinter node for {self.val.type} = {self.view["node"]}")
-      node = self.view["node"](self.val)
+    view = self.view
+    node_ctor = view.node
+    if node_ctor is not None:
+      log("ViewPrinter node for %s = %s", self.val.type, node_ctor)
+      node = node_ctor(self.val)
       yield from node.children()
-    elif "nodes" in self.view:
-      log(f"ViewPrinter raw nodes for {self.val.type}")
-      nodes = self.view["nodes"]
-      for i in range(len(nodes)):
-        name, func = nodes[i]
-        log(f"  node {name} = {func(self.val)}")
+    elif view.nodes:
+      log("ViewPrinter raw nodes for %s", self.val.type)
+      for name, func in view.nodes:
         try:
-          yield name, func(self.val)
+          value = func(self.val)
         except Exception as e:
-          log(f"ViewPrinter child exception: {e}\n  {traceback.format_exc()}")
+          log("ViewPrinter child exception: %s\n  %s", e, _TRACEBACK)
           yield name, "<error>"
+          continue
+        log("  node %s = %s", name, value)
+        yield name, value
       # if "elements" in self.view:
       #   log(f"ViewPrinter elements for {self.val.type}")
       #   INCOMPLETE()
@@ -884,93 +1493,126 @@ class ViewPrinter(gdb.ValuePrinter):
     return
 
   def to_string(self, max_len : int = MAX_SUMMARY_LEN):
-    if "summary" in self.view:
-      return _get_summary(self.view["summary"], self.val, max_len)
+    summary = self.view.summary
+    if summary is not None:
+      return _get_summary(summary, self.val, max_len)
     return ""
 
 class ChunkPrinter(gdb.ValuePrinter):
-  """Handler for chunked elements"""
-  def __init__(self, val : gdb.Value, offset : int, chunk_size : int):
+  """Handler for chunked elements.  val is the first element of the chunk, or
+     if `is_iterator`, an iterator to it."""
+  __slots__ = ("val", "offset", "chunk_size", "is_iterator")
+
+  def __init__(self, val : gdb.Value, offset : int, chunk_size : int, is_iterator : bool = False):
     self.val = val
     self.offset = offset
     self.chunk_size = chunk_size
+    self.is_iterator = is_iterator
 
   def children(self) -> PrinterChildren:
-    yield from emit_elements(self.val, self.offset, self.chunk_size)
+    if self.is_iterator:
+      return emit_elements(self.val, self.offset, self.chunk_size)
+    return self._element_children()
+
+  def _element_children(self) -> PrinterChildren:
+    # The chunk's elements follow its first in memory, so there's no iterator
+    # to unwrap or step.
+    try:
+      yield from _emit_pointer_elements(self.val.address, self.offset, self.chunk_size)
+    except Exception as e:
+      log("ChunkPrinter exception: %s\n  %s", e, _TRACEBACK)
 
   def to_string(self, _ : int = MAX_SUMMARY_LEN):
     return ""
 
-def _get_printer(val : gdb.Value, type_str : str):
-  printer = _match_printer(type_str)
-  if printer is not None:
-    log(f"Matched printer for type: {type_str}")
-    return DefaultPrinter(val, printer)
+def _get_printer(val : gdb.Value, t : gdb.Type, type_str : str):
+  info = _match_printer(type_str)
+  if info is not None:
+    log("Matched printer for type: %s", type_str)
+    return DefaultPrinter(val, info=info)
 
-  if val.type.code in USER_TYPE_CODES:
-    log(f"DefaultPrinter for struct/union type: {type_str}")
+  code = t.code
+  if code in USER_TYPE_CODES:
+    log("DefaultPrinter for struct/union type: %s", type_str)
     return DefaultPrinter(val)
 
-  if val.type.code == gdb.TYPE_CODE_ARRAY:
-    log(f"ArrayPrinter for array type: {type_str}")
+  if code == gdb.TYPE_CODE_ARRAY:
+    log("ArrayPrinter for array type: %s", type_str)
     return ArrayPrinter(val)
   
   return None
 
+def _static_tag_printer(actual_val : gdb.Value, _ : tuple[int, ...]):
+  log("StaticPrinter for %s", actual_val.type)
+  return StaticPrinter(actual_val)
+
+def _raw_tag_printer(actual_val : gdb.Value, _ : tuple[int, ...]):
+  log("RawPrinter for %s", actual_val.type)
+  info = _match_printer(_type_str(actual_val.type))
+  return RawPrinter(actual_val, info.printer if info is not None else None)
+
+def _chunk_tag_printer(actual_val : gdb.Value, enums : tuple[int, ...]):
+  log("ChunkPrinter for %s chunk size %d", actual_val.type, enums[1])
+  return ChunkPrinter(actual_val, offset=enums[1], chunk_size=enums[2],
+                      is_iterator=len(enums) > 3)
+
+def _msg_tag_printer(actual_val : gdb.Value, enums : tuple[int, ...]):
+  return MessagePrinter(actual_val, "".join(map(chr, enums[1:])))
+
+def _view_tag_printer(actual_val : gdb.Value, enums : tuple[int, ...]):
+  view_index = enums[0] - _VIEW_ENUM_I
+  log("ViewPrinter index %d for %s", view_index, actual_val.type)
+  actual_val_type_str = _type_str(actual_val.type)
+  info = _match_printer(actual_val_type_str)
+  assert info is not None, f"Type {actual_val_type_str} has no printer."
+  return ViewPrinter(actual_val, info.view_infos[view_index])
+
+# First tag enum -> the function making the printer for that kind of node.
+# Everything else is a view.
+_TAG_PRINTERS : dict[int, Callable[[gdb.Value, tuple[int, ...]], gdb.ValuePrinter]] = {
+  _MSG_ENUM_I: _msg_tag_printer,
+  _STATIC_ENUM_I: _static_tag_printer,
+  _RAW_ENUM_I: _raw_tag_printer,
+  _CHUNK_ENUM_I: _chunk_tag_printer,
+}
+
 def _lookup_type(val : gdb.Value):
-  type_str = str(val.type.unqualified())
-  log(f"type: {type_str}")
-
-  # Match synthetic node tags by looking for pointer pattern
-  if "(****)" in type_str:
-    enums = extract_enums_tag(val)
-    actual_val = recover_value(val)
-    actual_val_type_str = str(actual_val.type.unqualified())
-    printer = _match_printer(actual_val_type_str)
-
-    log(f"enums: {enums}")
-    if enums == _STATIC_ENUM:
-      log(f"StaticPrinter for {actual_val.type}")
-      return StaticPrinter(actual_val)
-    elif enums == _RAW_ENUM:
-      log(f"RawPrinter for {actual_val.type}")
-      return RawPrinter(actual_val, printer)
-    elif enums[0] == _CHUNK_ENUM_I:
-      log(f"ChunkPrinter for {actual_val.type} chunk size {enums[1]}")
-      return ChunkPrinter(actual_val, offset=enums[1], chunk_size=enums[2])
-    elif enums[0] == _MSG_ENUM_I:
-      return MessagePrinter(actual_val, "".join(map(chr, enums[1:])))
-    else:
-      # everything else is a view
-      view_index = enums[0] - _VIEW_ENUM_I
-      log(f"ViewPrinter index {view_index} for {actual_val.type}")
-      assert printer is not None, f"Type {actual_val_type_str} has no printer."
-      return ViewPrinter(actual_val, printer["views"][view_index])
+  t = val.type
+
+  # Match synthetic node tags by their type's shape
+  tag = try_split_enums_tag(val, t)
+  if tag is not None:
+    enums, actual_val = tag
+
+    log("enums: %s", enums)
+    return _TAG_PRINTERS.get(enums[0], _view_tag_printer)(actual_val, enums)
 
-  printerObj = _get_printer(val, type_str)
+  type_str = _type_str(t)
+  log("type: %s", type_str)
+  printerObj = _get_printer(val, t, type_str)
   if printerObj:
     return printerObj
 
-  log(f"No printer found for type: {type_str}")
+  log("No printer found for type: %s", type_str)
   return None
 
 def disable_all_printers():
   """ Disable all existing pretty-printers in gdb.pretty_printers and
       gdb.objfiles().pretty_printers """
   log("Disabling existing pretty-printers")
-  log(f"Current pretty-printers: {gdb.pretty_printers}")
+  log("Current pretty-printers: %s", gdb.pretty_printers)
   # Disable all global/prgspace printers
   for pp in gdb.pretty_printers:
-    log(f"Global printer: {pp}")
+    log("Global printer: %s", pp)
     if hasattr(pp, "enabled"):
-      log(f"Disabling global printer: {pp}")
+      log("Disabling global printer: %s", pp)
       pp.enabled = False
 
   # Disable all printers attached to each objfile
   for obj in gdb.objfiles():
     for pp in getattr(obj, "pretty_printers", []):
       if hasattr(pp, "enabled"):
-        log(f"Disabling objfile printer: {pp}")
+        log("Disabling objfile printer: %s", pp)
         pp.enabled = False
 
   log("All existing pretty-printers disabled")
@@ -978,6 +1620,16 @@ def disable_all_printers():
 # TODO: Get iterator chunking working
 # disable_all_printers()
 
+def _clear_type_caches(_ : object) -> None:
+  # The caches are keyed by type strings, and loading/unloading code (e.g.
+  # re-running the program after a rebuild) can change what a name refers to.
+  for clear in _type_cache_clears:
+    clear()
+
+gdb.events.new_objfile.connect(_clear_type_caches)
+gdb.events.clear_objfiles.connect(_clear_type_caches)
+gdb.events.inferior_deleted.connect(_clear_type_caches)
+
 log("Enabling custom pretty-printers")
 gdb.pretty_printers.append(_lookup_type)
 
@@ -9,8 +9,7 @@ are capable of being reverted back to their original type quickly and easily.
 
 import gdb
 import re
-from gdb_logger import log
-from typing import Tuple
+from typing import Callable, Tuple
 
 def make_enums_tag(val : gdb.Value, enum_tuple : Tuple[int, ...]) -> gdb.Value:
   """Create a synthetic tag value for gdb.
@@ -32,12 +31,117 @@ def make_enums_tag(val : gdb.Value, enum_tuple : Tuple[int, ...]) -> gdb.Value:
     The synthetic tag value (address casted to a pointer of a N dimensional
     array of quad-pointer type).
   """
-  base_type = val.type.pointer()
+  t = val.type
+  return val.address.cast(_tag_type(t, _tag_type_key(t), None, enum_tuple))
+
+def _enums_tag_type(base_type : gdb.Type, enum_tuple : Tuple[int, ...]) -> gdb.Type:
   array_type = base_type
   for enum in reversed(enum_tuple):
     array_type = array_type.array(enum - 1)
-  ptr_type = array_type.pointer().pointer().pointer().pointer()
-  return val.address.cast(ptr_type)
+  return array_type.pointer().pointer().pointer().pointer()
+
+# ((type code, type name), enum tuple) -> (type, tag type for values of that
+# type), so tagging e.g. each element of a container doesn't rebuild the same
+# type.  A name doesn't always identify one type (same-named C structs in
+# different translation units, classes in anonymous namespaces or functions),
+# so a hit is only used if its type compares equal to the one being tagged.
+# That is a pointer compare when it's the same type.  Once it holds
+# _TAG_TYPE_CACHE_MAX types the oldest entry is dropped for each new one.
+_tag_type_cache : dict[tuple[tuple[int, str], Tuple[int, ...]], tuple[gdb.Type, gdb.Type]] = {}
+_TAG_TYPE_CACHE_MAX = 4096
+
+def _tag_type_key(t : gdb.Type) -> tuple[int, str] | None:
+  # Only unqualified named types are cached.  A cv-qualified type has the same
+  # name, and its tag has to keep the qualifiers for recover_value().  For an
+  # unqualified type unqualified() returns the same type, so this compare is
+  # cheap.
+  name = t.name
+  if name is None or t != t.unqualified():
+    return None
+  return (t.code, name)
+
+def _tag_type(t : gdb.Type, key : tuple[int, str] | None, base_type : gdb.Type | None,
+              enum_tuple : Tuple[int, ...]) -> gdb.Type:
+  if key is None:
+    return _enums_tag_type(base_type or t.pointer(), enum_tuple)
+  cache_key = (key, enum_tuple)
+  entry = _tag_type_cache.get(cache_key)
+  if entry is not None and entry[0] == t:
+    return entry[1]
+  if entry is None and len(_tag_type_cache) >= _TAG_TYPE_CACHE_MAX:
+    del _tag_type_cache[next(iter(_tag_type_cache))]
+  # A different type of the same name replaces the entry.
+  tag_type = _enums_tag_type(base_type or t.pointer(), enum_tuple)
+  _tag_type_cache[cache_key] = (t, tag_type)
+  return tag_type
+
+def _clear_tag_type_cache(_ : object) -> None:
+  # Loading/unloading code can change what a type name refers to.
+  _tag_type_cache.clear()
+
+gdb.events.new_objfile.connect(_clear_tag_type_cache)
+gdb.events.clear_objfiles.connect(_clear_tag_type_cache)
+
+def enums_tagger(val : gdb.Value) -> Callable[[Tuple[int, ...]], gdb.Value]:
+  """Returns a function that makes make_enums_tag(val, enum_tuple) tags, for
+  when several tags are made for the same value.  The value's address and
+  pointer type are only looked up once.
+
+  Parameters
+  ----------
+  val : gdb.Value
+    The original value (usually the object instance).
+
+  Returns
+  -------
+  Callable[[tuple[int, ...]], gdb.Value]
+    Takes the enum tuple and returns the synthetic tag value.
+  """
+  address = val.address
+  t = val.type
+  key = _tag_type_key(t)
+  base_type = t.pointer()
+  def tag(enum_tuple : Tuple[int, ...]) -> gdb.Value:
+    return address.cast(_tag_type(t, key, base_type, enum_tuple))
+  return tag
+
+def enums_type_tagger(t : gdb.Type) -> Callable[[gdb.Value, Tuple[int, ...]], gdb.Value]:
+  """Returns a function that makes make_enums_tag(val, enum_tuple) tags for
+  values of type `t`, for when many values of the same type are tagged.  The
+  pointer type is only built once.
+
+  Parameters
+  ----------
+  t : gdb.Type
+    The type of the values that will be tagged.
+
+  Returns
+  -------
+  Callable[[gdb.Value, tuple[int, ...]], gdb.Value]
+    Takes the value and enum tuple and returns the synthetic tag value.
+  """
+  key = _tag_type_key(t)
+  base_type = t.pointer()
+  def tag(val : gdb.Value, enum_tuple : Tuple[int, ...]) -> gdb.Value:
+    return val.address.cast(_tag_type(t, key, base_type, enum_tuple))
+  return tag
+
+
+def is_enums_tag_type(t : gdb.Type) -> bool:
+  """Check if a type has the shape of a synthetic tag type made by
+  make_enums_tag(), without stringifying it.
+
+  Parameters
+  ----------
+  t : gdb.Type
+    Type to check.
+
+  Returns
+  -------
+  bool
+    True if `t` is a quad-pointer to one or more arrays of a pointer type.
+  """
+  return _walk_tag_type(t) is not None
 
 
 def extract_enums_tag(val : gdb.Value) -> Tuple[int, ...]:
@@ -52,10 +156,36 @@ def extract_enums_tag(val : gdb.Value) -> Tuple[int, ...]:
   -------
   tuple[int, ...]
     Tuple of decoded integers (in the same order they were encoded).
+
+  Raises
+  ------
+  ValueError
+    `val` isn't a synthetic tag.
   """
-  matched = get_type_tag_matches(str(val.type))
-  matches = SYNTH_TAGS_RE.findall(matched.group('tags'))
-  return tuple(int(m) for m in matches)
+  t = val.type
+  parts = _walk_tag_type(t)
+  if parts is None:
+    raise ValueError(f"'{t}' isn't a tag type")
+  return parts[0]
+
+def _walk_tag_type(t : gdb.Type) -> Tuple[Tuple[int, ...], gdb.Type] | None:
+  # Undoes make_enums_tag() on the type itself rather than stringifying and
+  # parsing it: under the four pointer levels are the arrays whose lengths are
+  # the enums, outermost first, and under those the original value's pointer
+  # type, cv-qualifiers and typedefs intact.  None if `t` isn't shaped like
+  # that, so checking for a tag and taking it apart is one walk.
+  for _ in range(4):
+    if t.code != gdb.TYPE_CODE_PTR:
+      return None
+    t = t.target()
+  enums : list[int] = []
+  while t.code == gdb.TYPE_CODE_ARRAY:
+    low, high = t.range()
+    enums.append(high - low + 1)
+    t = t.target()
+  if not enums or t.code != gdb.TYPE_CODE_PTR:
+    return None
+  return tuple(enums), t
 
 SYNTH_TAG_TYPE_RE = re.compile(r'^(?P<c>const )?(?P<v>volatile )?(?P<type>.+?)(?P<open>\()?\*\(\*\*\*\*\)' \
                           r'(?P<tags>(?:\[\d+\])+)(?(open)\))(?P<array>.*)$')
@@ -71,6 +201,10 @@ def get_type_tag_matches(type_str : str) -> re.Match[str]:
   'array' - any array items if any
   'tags' - A set of [] enclosed ints to state the enums.
 
+  This module decodes tags from the tag type itself (see split_enums_tag()),
+  which needs no string parsing, so this is only for callers that have nothing
+  but the type's string.
+
   Parameters
   ----------
   type_str : string
@@ -87,7 +221,8 @@ def get_type_tag_matches(type_str : str) -> re.Match[str]:
       The type_str doesn't represent a tag type.
 
   """
-  matches = SYNTH_TAG_TYPE_RE.search(type_str)
+  # The pattern is anchored at the start, so match() rather than search().
+  matches = SYNTH_TAG_TYPE_RE.match(type_str)
   if matches is None:
     raise ValueError(f"couldn't match tag type '{type_str}'")
   return matches
@@ -107,16 +242,58 @@ def recover_value(val : gdb.Value) -> gdb.Value:
   -------
   gdb.Value
     The original value with its proper base type.
+
+  Raises
+  ------
+  ValueError
+    `val` isn't a synthetic tag.
+  """
+  return split_enums_tag(val)[1]
+
+def split_enums_tag(val : gdb.Value) -> Tuple[Tuple[int, ...], gdb.Value]:
+  """extract_enums_tag() and recover_value() together.
+
+  Parameters
+  ----------
+  val : gdb.Value
+    The synthetic tagged value.
+
+  Returns
+  -------
+  tuple[tuple[int, ...], gdb.Value]
+    The decoded integers and the original value.
+
+  Raises
+  ------
+  ValueError
+    `val` isn't a synthetic tag.
+  """
+  t = val.type
+  tag = try_split_enums_tag(val, t)
+  if tag is None:
+    raise ValueError(f"'{t}' isn't a tag type")
+  return tag
+
+def try_split_enums_tag(val : gdb.Value, t : gdb.Type) \
+  -> Tuple[Tuple[int, ...], gdb.Value] | None:
+  """is_enums_tag_type() and split_enums_tag() together, walking the type
+  once.
+
+  Parameters
+  ----------
+  val : gdb.Value
+    The value to check.
+  t : gdb.Type
+    `val.type`, if already fetched.
+
+  Returns
+  -------
+  tuple[tuple[int, ...], gdb.Value] | None
+    The decoded integers and the original value, or None if `val` isn't a
+    synthetic tag.
   """
-  matched = get_type_tag_matches(str(val.type))
-  base_type = gdb.lookup_type(matched.group('type'))
-  if matched['v']:
-    base_type = base_type.volatile()
-  if matched['c']:
-    base_type = base_type.const()
-  log(f'type found: {base_type}')
-  if matched['array']:
-    array_sizes = SYNTH_TAGS_RE.findall(matched['array'])
-    for array_size in reversed(array_sizes):
-      base_type = base_type.array(array_size)
-  return val.cast(base_type.pointer()).dereference()
+  parts = _walk_tag_type(t)
+  if parts is None:
+    return None
+  enums, base_ptr_type = parts
+  return enums, val.cast(base_ptr_type).dereference()
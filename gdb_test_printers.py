@@ -5,39 +5,50 @@ from typing import Optional
 # GDB pretty-printer example for ColorRGBA
 class ComponentsNode(gdb.ValuePrinter):
   """Synthetic node for RGB components"""
+  __slots__ = ("val", "_r", "_g", "_b")
+
   def __init__(self, val):
     # val is the original ColorRGBA, not a pointer
     self.val = val
+    self._r, self._g, self._b = val['r'], val['g'], val['b']
   
   def children(self):
-    yield 'red', self.val['r']
-    yield 'green', self.val['g'] 
-    yield 'blue', self.val['b']
+    yield 'red', self._r
+    yield 'green', self._g
+    yield 'blue', self._b
 
   def to_string(self, _:int = MAX_SUMMARY_LEN) -> str:
     return ''
 
 class AlphaNode(gdb.ValuePrinter):
   """Synthetic node for alpha channel"""
+  __slots__ = ("val", "_a")
+
   def __init__(self, val):
     self.val = val
+    self._a = val['a']
   
   def children(self):
-    yield 'raw', self.val['a']
-    yield 'normalized', gdb.Value(float(self.val['a']) / 255.0)
+    yield 'raw', self._a
+    yield 'normalized', float(self._a) / 255.0
 
   def to_string(self, _:int = MAX_SUMMARY_LEN) -> str:
     return ''
 
 class StatisticsNode(gdb.ValuePrinter):
   """Synthetic node for computed values"""
+  __slots__ = ("val", "_brightness", "_opacity")
+
   def __init__(self, val):
     self.val = val
+    self._brightness = (int(val['r']) + int(val['g']) + int(val['b'])) / 3.0
+    self._opacity = float(val['a']) / 255.0
   
   def children(self):
-    brightness = (int(self.val['r']) + int(self.val['g']) + int(self.val['b'])) / 3.0
-    yield 'brightness', gdb.Value(float(brightness))
-    yield 'opacity', gdb.Value(float(self.val['a']) / 255.0)
+    # gdb converts Python floats itself, so they needn't be wrapped in
+    # gdb.Values here.
+    yield 'brightness', self._brightness
+    yield 'opacity', self._opacity
 
   def to_string(self, _:int = MAX_SUMMARY_LEN) -> str:
     return ''
@@ -56,7 +67,7 @@ add_printer("ColorRGBA", {
         "summary": summary(named=False, show_type=False),
         "nodes": (
           ("python string", lambda _: "v['a']"),
-          ("normalized",    lambda v: gdb.Value(float(v['a']) / 255.0)),
+          ("normalized",    lambda v: float(v['a']) / 255.0),
         ),
         # "elements": lambda v: emit_chunked_elements(v.begin(), v.end())
       },
@@ -0,0 +1,82 @@
+"""
+Tests for the parts of gdb_printers that don't need an inferior.  gdb's Python
+module only exists inside gdb, so elsewhere a stand-in with just what importing
+the printers needs is put in its place.  Under gdb they run against the real
+module, e.g.:
+
+  gdb -batch -ex "python import sys, pytest; sys.exit(pytest.main(['-q', 'test_gdb_printers.py']))"
+"""
+import sys
+import types
+
+import pytest
+
+def _stub_gdb() -> types.ModuleType:
+  gdb = types.ModuleType("gdb")
+
+  class _Event:
+    def connect(self, handler): pass
+
+  gdb.events = types.SimpleNamespace(before_prompt=_Event(), cont=_Event(), new_objfile=_Event(),
+                                     clear_objfiles=_Event(), inferior_deleted=_Event())
+  gdb.error = type("error", (RuntimeError,), {})
+  for name in ("Type", "Value", "Field", "ValuePrinter", "ContinueEvent"):
+    setattr(gdb, name, type(name, (), {}))
+  for i, name in enumerate(("PTR", "ARRAY", "STRUCT", "UNION", "REF", "RVALUE_REF")):
+    setattr(gdb, f"TYPE_CODE_{name}", i + 1)
+  gdb.STDOUT, gdb.STDERR = 0, 1
+  gdb.pretty_printers = []
+
+  def parameter(name):
+    raise RuntimeError(f"no parameter {name}")
+
+  gdb.parameter = parameter
+  gdb.write = lambda text, stream=0: None
+  gdb.flush = lambda: None
+  return gdb
+
+try:
+  import gdb
+except ImportError:
+  sys.modules["gdb"] = _stub_gdb()
+
+import gdb_printers as P
+
+@pytest.fixture(autouse=True)
+def _restore_printers():
+  """Puts back the printers registered before the test, so printers a test adds
+     don't leak into the tests after it."""
+  printers = dict(P._pretty_printers)
+  printers_re = list(P._pretty_printers_re)
+  yield
+  P._pretty_printers.clear()
+  P._pretty_printers.update(printers)
+  P._pretty_printers_re[:] = printers_re
+  P._re_runs_dirty = True
+  P._match_printer.cache_clear()
+
+def test_iterator_markers_match_outermost_template():
+  # A list iterator over vector iterators is bidirectional, not random access.
+  nested = "std::_List_iterator<__gnu_cxx::__normal_iterator<int*, std::vector<int, std::allocator<int> > > >"
+  assert P._template_name(nested) == "_List_iterator"
+  assert not P._has_marker(nested, P._RA_TYPE_MARKERS)
+  assert P._has_marker(nested, P._BIDI_TYPE_MARKERS)
+
+def test_iterator_markers_ignore_scope_and_cv():
+  assert P._has_marker("__gnu_cxx::__normal_iterator<int*, std::vector<int> >", P._RA_TYPE_MARKERS)
+  assert P._has_marker("const std::__1::__wrap_iter<int*>", P._RA_TYPE_MARKERS)
+  assert not P._has_marker("int *", P._FWD_TYPE_MARKERS)
+  assert not P._has_marker(None, P._FWD_TYPE_MARKERS)
+
+def test_regex_printer_with_backreference():
+  # The backreference has to keep pointing at this pattern's own group after
+  # the regex printers are combined.
+  plain : P.Printer = {}
+  same : P.Printer = {}
+  other : P.Printer = {}
+  P.add_re_printer(r"test_ns::plain<.*>", plain)
+  P.add_re_printer(r"(test_ns)::same<(\w+), \2>", same)
+  P.add_re_printer(r"(test_ns)::same<.*>", other)
+  assert P._match_printer("test_ns::plain<int>").printer is plain
+  assert P._match_printer("test_ns::same<int, int>").printer is same
+  assert P._match_printer("test_ns::same<int, long>").printer is other